@@ -17,42 +17,34 @@ DATA_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(exist_ok=True)
 
 # File paths
-DATABASE_PATH = DATA_DIR / "invoice_database.csv"
+DATABASE_PATH = DATA_DIR / "invoice_database.db"
 MODEL_PATH = MODELS_DIR / "vendor_classifier.pkl"
 
 # OCR Configuration
-# Default paths, will be overridden by environment-specific settings below
-TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-POPPLER_PATH = r'C:\Program Files\poppler-24.08.0\Library\bin'
-
-# Environment-specific configurations
-if platform.system() == 'Windows':
-    # Windows paths
-    TESSERACT_PATH = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-    POPPLER_PATH = r'C:\Program Files\poppler-24.08.0\Library\bin'
-elif platform.system() == 'Linux':
-    # Linux paths
-    TESSERACT_PATH = '/usr/bin/tesseract'
-    POPPLER_PATH = '/usr/bin'
-elif platform.system() == 'Darwin':
-    # Mac OS paths
-    TESSERACT_PATH = '/usr/local/bin/tesseract'
-    POPPLER_PATH = '/usr/local/bin'
+# Tesseract and Poppler paths per platform, as (TESSERACT_PATH, POPPLER_PATH)
+_PLATFORM_PATHS = {
+    'Windows': (r'C:\Program Files\Tesseract-OCR\tesseract.exe', r'C:\Program Files\poppler-24.08.0\Library\bin'),
+    'Linux': ('/usr/bin/tesseract', '/usr/bin'),
+    'Darwin': ('/usr/local/bin/tesseract', '/usr/local/bin'),  # Mac OS
+}
+# Default to the Windows paths on other platforms
+_DEFAULT_TESSERACT_PATH, _DEFAULT_POPPLER_PATH = _PLATFORM_PATHS.get(platform.system(), _PLATFORM_PATHS['Windows'])
 
 # Override with environment variables if set
-if os.environ.get('TESSERACT_PATH'):
-    TESSERACT_PATH = os.environ.get('TESSERACT_PATH')
-if os.environ.get('POPPLER_PATH'):
-    POPPLER_PATH = os.environ.get('POPPLER_PATH')
+TESSERACT_PATH = os.environ.get('TESSERACT_PATH') or _DEFAULT_TESSERACT_PATH
+POPPLER_PATH = os.environ.get('POPPLER_PATH') or _DEFAULT_POPPLER_PATH
 
 # OCR Configuration
-OCR_DPI = 300  # DPI for PDF to image conversion
+OCR_DPI = 200  # DPI for PDF to image conversion
 OCR_LANG = 'eng'  # OCR language
 OCR_CONFIG = '--psm 6 --oem 3'  # OCR configuration
+OCR_USE_ADAPTIVE = False  # Always use adaptive thresholding (slower; otherwise only for unevenly lit pages)
+PREPROCESS_BACKEND = os.environ.get('PREPROCESS_BACKEND', 'cpu')  # 'cpu' or 'opencl' (GPU via cv2.UMat)
 
 # Machine Learning Configuration
 ML_CONFIDENCE_THRESHOLD = 0.8  # Threshold for auto-approval
 ML_TRAIN_SAMPLES_PER_VENDOR = 10  # Number of training samples per vendor
+ML_TRAINING_CACHE_TTL = 7 * 24 * 60 * 60  # Seconds before cached training data is regenerated
 
 # UI Configuration
 UI_WINDOW_SIZE = "900x700"
@@ -9,6 +9,6 @@ This package contains the main processing components:
 """
 
 from invoice_processor.core.document_processor import extract_text_from_invoice, preprocess_image
-from invoice_processor.core.data_extractor import parse_invoice_text
+from invoice_processor.core.data_extractor import parse_invoice_text, parse_invoice_texts
 from invoice_processor.core.ml_classifier import VendorClassifier
-from invoice_processor.core.database import save_to_database, export_to_accounting_system
\ No newline at end of file
+from invoice_processor.core.database import save_to_database, save_many_to_database, export_to_accounting_system
\ No newline at end of file
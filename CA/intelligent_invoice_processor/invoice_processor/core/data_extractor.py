@@ -7,12 +7,237 @@ validates the extracted data, and provides confidence scoring.
 
 import re
 import datetime
-from fuzzywuzzy import process
+import logging
+from math import fsum
+from operator import itemgetter
+import numpy as np
+import pandas as pd
+from rapidfuzz import process, fuzz, utils
 
 from invoice_processor.data.vendor_database import VENDOR_DATABASE
 from invoice_processor.logger import app_logger
 from invoice_processor.config import ML_CONFIDENCE_THRESHOLD
 
+# Vendor names used as fuzzy matching choices
+_VENDOR_KEYS = list(VENDOR_DATABASE.keys())
+
+# Lowercased vendor names for the exact substring lookup
+_VENDOR_LOWER = [(name.lower(), name) for name in VENDOR_DATABASE]
+
+# Quantity, unit price and total at the end of an item line, optionally followed by
+# text without digits such as a currency code. The description is everything before
+# the match. Each candidate position is only checked over the next few tokens, so a
+# line costs time linear in its length
+_ITEM_TAIL = re.compile(r'\s(\d+)\s+[€$]?([\d.,]+)\s+[€$]?([\d.,]+)(?:\s+[^\d\s]\D*)?$')
+
+# Regex patterns for the invoice metadata fields
+_METADATA_PATTERNS = {
+    field: [re.compile(p, re.IGNORECASE) for p in pattern_list]
+    for field, pattern_list in {
+        "invoice_no": [r'Invoice\s*(?:#|No|Number|num)[:.\s]*\s*([A-Za-z0-9-]+)', 
+                       r'Invoice\s*ID[:.\s]*\s*([A-Za-z0-9-]+)'],
+        "date": [r'(?:Invoice\s*)?Date[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})',
+                 r'(?:Invoice\s*)?Date[:.\s]*\s*(\d{1,2}\s+[A-Za-z]+\s+\d{2,4})'],
+        "due_date": [r'Due\s*Date[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})',
+                     r'Payment\s*Due[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})'],
+        "po_number": [r'P\.?O\.?\s*(?:Number|No|#)?[:.\s]*\s*([A-Za-z0-9-]+)',
+                      r'Purchase\s*Order\s*(?:Number|No|#)?[:.\s]*\s*([A-Za-z0-9-]+)'],
+        "total_amount": [r'(?:Total|Amount\s*Due|Balance\s*Due)[:.\s]*\s*\$?\s*(\d+[,\d]*\.\d+)',
+                         r'(?:Total|Amount\s*Due|Balance\s*Due)[:.\s]*\s*\$?\s*(\d+[,\d]*)']
+    }.items()
+}
+
+# Lowercase keywords, one of which must appear in the text for a field's patterns to match
+_FIELD_KEYWORDS = {
+    "invoice_no": ("invoice",),
+    "date": ("date",),
+    "due_date": ("due",),
+    "po_number": ("po", "p.o", "purchase"),
+    "total_amount": ("total", "amount", "balance")
+}
+
+# Combined metadata regexes, keyed by the tuple of fields they cover
+_METADATA_RE_CACHE = {}
+
+def _metadata_regex(fields):
+    """
+    Get a single regex combining the metadata patterns of the given fields
+    
+    The text is then scanned once for all fields. Each alternative is named
+    <field>_<priority> and wrapped in a lookahead so that overlapping fields
+    (e.g. "Date" inside "Due Date") are still reported.
+    
+    Args:
+        fields (tuple): Metadata field names
+        
+    Returns:
+        re.Pattern: Combined regex
+    """
+    regex = _METADATA_RE_CACHE.get(fields)
+    if regex is None:
+        regex = re.compile('|'.join(
+            f'(?=(?P<{field}_{priority}>{pattern.pattern}))'
+            for field in fields
+            for priority, pattern in enumerate(_METADATA_PATTERNS[field])
+        ), re.IGNORECASE)
+        _METADATA_RE_CACHE[fields] = regex
+    return regex
+
+# Table header patterns marking the start of the item section
+_HEADER_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in [
+    r'(Item|Description|Product)[\s\t]+(Qty|Quantity)[\s\t]+(Price|Rate|Unit\s*Price)[\s\t]+(Amount|Total)',
+    r'(Description|Item|Product)[\s\t]+(Quantity|Qty)[\s\t]+(Unit\s*Price|Price|Rate)[\s\t]+(Line\s*Total|Total|Amount)'
+])
+
+# End of the item table (typically the subtotal/total section)
+_TABLE_END_PATTERN = re.compile(r'(Sub)?Total|Tax|Discount|Balance', re.IGNORECASE)
+
+# Numeric date with a consistent separator (/, - or .)
+_DATE_RE = re.compile(r'(\d{1,2})([/.\-])(\d{1,2})\2(\d{4})$')
+
+# Number of lines read as the item table when no end marker is found
+_MAX_TABLE_LINES = 15
+
+# Item tables with at least this many lines are parsed with pandas
+_VECTORIZE_MIN_LINES = 50
+
+# Regex patterns for the totals section
+_TOTAL_PATTERNS = {
+    field: re.compile(p, re.IGNORECASE)
+    for field, p in {
+        "subtotal": r'Sub[\s\-]?total[:.\s]*\s*\$?\s*([\d.,]+)',
+        "tax": r'(?:Tax|VAT|GST)[:.\s]*\s*\$?\s*([\d.,]+)',
+        "shipping": r'(?:Shipping|Freight|Delivery)[:.\s]*\s*\$?\s*([\d.,]+)',
+        "discount": r'Discount[:.\s]*\s*\$?\s*([\d.,]+)',
+        "total": r'(?:Total|Balance\s*Due)[:.\s]*\s*\$?\s*([\d.,]+)'
+    }.items()
+}
+
+# Validation status by minimum overall confidence, as
+# (threshold, status, whether the status allows validation warnings)
+_STATUS_TABLE = (
+    (ML_CONFIDENCE_THRESHOLD, "Auto-Approved", False),
+    (0.6, "Needs Review", True),
+    (0.0, "Manual Processing Required", True),
+)
+
+# Removes currency symbols and spaces, and replaces comma with dot
+_DECIMAL_TRANS = str.maketrans({'€': None, '$': None, ' ': None, ',': '.'})
+
+def _parse_decimal(value):
+    """
+    Parse a price value, handling different decimal formats (. or ,)
+    
+    Args:
+        value (str): Price text
+        
+    Returns:
+        float: Parsed value or None if it could not be parsed
+    """
+    try:
+        return float(value.translate(_DECIMAL_TRANS))
+    except (ValueError, TypeError):
+        app_logger.warning(f"Could not parse decimal value: {value}")
+        return None
+
+def _parse_item_line(line, app_logger):
+    """
+    Parse a single line item with robust parsing
+    
+    Args:
+        line (str): Stripped line of text
+        app_logger (Logger): Logger for tracking extraction process
+        
+    Returns:
+        dict: Extracted line item or None if the line could not be parsed
+    """
+    match = _ITEM_TAIL.search(line)
+    if not match:
+        return None
+    
+    try:
+        # Everything before the quantity is the description
+        item_description = line[:match.start()].strip()
+        
+        # Validate and parse quantity
+        try:
+            quantity = int(match.group(1))
+        except ValueError:
+            app_logger.warning(f"Invalid quantity in line: {line}")
+            return None
+        
+        unit_price = _parse_decimal(match.group(2))
+        total_price = _parse_decimal(match.group(3))
+        
+        # Skip if parsing fails
+        if unit_price is None or total_price is None:
+            return None
+        
+        # Validate total price calculation (with small tolerance)
+        calculated_total = round(quantity * unit_price, 2)
+        if abs(calculated_total - total_price) > 0.02:
+            app_logger.warning(f"Possible price calculation discrepancy: "
+                               f"Calculated {calculated_total}, Given {total_price}")
+        
+        return {
+            "description": item_description,
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "total": total_price
+        }
+    
+    except Exception as e:
+        app_logger.warning(f"Error processing line '{line}': {e}")
+        return None
+
+def _extract_line_items_vectorized(lines, app_logger):
+    """
+    Extract line items from a block of lines with vectorized pandas string operations
+    
+    Lines are matched and their prices parsed column-wise, with the same rules as
+    parsing the lines one by one.
+    
+    Args:
+        lines (list): Lines of the item table
+        app_logger (Logger): Logger for tracking extraction process
+    
+    Returns:
+        list: Extracted line items
+    """
+    lines = pd.Series(lines, dtype=object).str.strip()
+    lines = lines[lines != '']
+    if lines.empty:
+        return []
+    
+    groups = lines.str.extract(_ITEM_TAIL)
+    unit_price = pd.to_numeric(groups[1].str.translate(_DECIMAL_TRANS), errors='coerce')
+    total_price = pd.to_numeric(groups[2].str.translate(_DECIMAL_TRANS), errors='coerce')
+    parsed = unit_price.notna() & total_price.notna()
+    
+    # If the line did not match, log it for debugging
+    for line in lines[~parsed]:
+        app_logger.warning(f"Could not extract item from line: '{line}'")
+    
+    if not parsed.any():
+        return []
+    
+    # The tail matches at most once, so removing it leaves the description
+    items = pd.DataFrame({
+        "description": lines[parsed].str.replace(_ITEM_TAIL, '', regex=True).str.strip(),
+        "quantity": groups.loc[parsed, 0].astype(int),
+        "unit_price": unit_price[parsed],
+        "total": total_price[parsed]
+    })
+    
+    # Validate total price calculation (with small tolerance)
+    calculated_total = (items["quantity"] * items["unit_price"]).round(2)
+    mismatched = (calculated_total - items["total"]).abs() > 0.02
+    for calculated, given in zip(calculated_total[mismatched], items["total"][mismatched]):
+        app_logger.warning(f"Possible price calculation discrepancy: "
+                           f"Calculated {calculated}, Given {given}")
+    
+    return items.to_dict('records')
+
 def extract_line_items(lines, start_line, end_line, app_logger):
     """
     Extract line items from invoice text with robust parsing
@@ -26,88 +251,84 @@ def extract_line_items(lines, start_line, end_line, app_logger):
     Returns:
         list: Extracted line items
     """
-    items = []
-    
-    # Comprehensive regex patterns for item extraction
-    item_patterns = [
-        # Most flexible pattern - handles multiple spacing, currency symbols, decimal formats
-        r'^([A-Za-z0-9\s\-\(\)/&]+?)[\s\t]{1,}(\d+)[\s\t]{1,}[€$]?([\d.,]+)[\s\t]{1,}[€$]?([\d.,]+)$',
-        
-        # Pattern with stricter whitespace matching
-        r'^([A-Za-z0-9\s\-\(\)/&]+)\s+(\d+)\s+[€$]?([\d.,]+)\s+[€$]?([\d.,]+)$',
-        
-        # Extra pattern for tighter matching
-        r'^(.*?)\s{2,}(\d+)\s{2,}[€$]?([\d.,]+)\s{2,}[€$]?([\d.,]+)$'
-    ]
-    
     app_logger.debug(f"Extracting items from lines {start_line} to {end_line}")
     
+    # Large tables are parsed column-wise by pandas rather than line by line
+    if end_line - start_line >= _VECTORIZE_MIN_LINES:
+        items = _extract_line_items_vectorized(lines[start_line:end_line], app_logger)
+        app_logger.info(f"Extracted {len(items)} line items")
+        return items
+    
+    items = []
+    debug = app_logger.isEnabledFor(logging.DEBUG)
     for i in range(start_line, end_line):
         line = lines[i].strip()
         if not line:
             continue
         
-        matched = False
-        for pattern in item_patterns:
-            match = re.match(pattern, line, re.UNICODE)
-            if match:
-                try:
-                    # Extract and clean the matched groups
-                    item_description = match.group(1).strip()
-                    
-                    # Validate and parse quantity
-                    try:
-                        quantity = int(match.group(2).strip())
-                    except ValueError:
-                        app_logger.warning(f"Invalid quantity in line: {line}")
-                        continue
-                    
-                    # Handle different decimal formats (. or ,)
-                    def parse_decimal(value):
-                        try:
-                            # Remove currency symbols, spaces, and replace comma with dot
-                            cleaned = value.replace('€', '').replace('$', '').replace(' ', '').replace(',', '.')
-                            return float(cleaned)
-                        except (ValueError, TypeError):
-                            app_logger.warning(f"Could not parse decimal value: {value}")
-                            return None
-                    
-                    unit_price = parse_decimal(match.group(3))
-                    total_price = parse_decimal(match.group(4))
-                    
-                    # Skip if parsing fails
-                    if unit_price is None or total_price is None:
-                        continue
-                    
-                    # Validate total price calculation (with small tolerance)
-                    calculated_total = round(quantity * unit_price, 2)
-                    if abs(calculated_total - total_price) > 0.02:
-                        app_logger.warning(f"Possible price calculation discrepancy: "
-                                           f"Calculated {calculated_total}, Given {total_price}")
-                    
-                    new_item = {
-                        "description": item_description,
-                        "quantity": quantity,
-                        "unit_price": unit_price,
-                        "total": total_price
-                    }
-                    
-                    items.append(new_item)
-                    app_logger.debug(f"Extracted item: {new_item}")
-                    matched = True
-                    break
-                
-                except Exception as e:
-                    app_logger.warning(f"Error processing line '{line}': {e}")
-                    continue
-        
-        # If no pattern matched, log the line for debugging
-        if not matched and line.strip():
+        new_item = _parse_item_line(line, app_logger)
+        if new_item:
+            items.append(new_item)
+            if debug:
+                app_logger.debug(f"Extracted item: {new_item}")
+        else:
+            # If no pattern matched, log the line for debugging
             app_logger.warning(f"Could not extract item from line: '{line}'")
     
     app_logger.info(f"Extracted {len(items)} line items")
     return items
 
+def _parse_date(date_str):
+    """
+    Parse a numeric invoice date, trying month-first then day-first order
+    
+    Args:
+        date_str (str): Date text such as 03/29/2024, 29-03-2024 or 29.03.2024
+        
+    Returns:
+        datetime.datetime: Parsed date or None if it could not be parsed
+    """
+    match = _DATE_RE.match(date_str)
+    if not match:
+        return None
+    
+    first, second, year = int(match.group(1)), int(match.group(3)), int(match.group(4))
+    for month, day in ((first, second), (second, first)):
+        try:
+            return datetime.datetime(year, month, day)
+        except ValueError:
+            continue
+    return None
+
+def _first_lines(lines):
+    """
+    Get the invoice header used for vendor matching
+    
+    Args:
+        lines (list): Lines of the invoice text
+        
+    Returns:
+        str: First few lines of the text
+    """
+    return '\n'.join(lines[:5])
+
+def _exact_vendor_match(first_lines):
+    """
+    Look for a known vendor name printed verbatim in the invoice header
+    
+    Args:
+        first_lines (str): First few lines of the invoice text
+        
+    Returns:
+        str: Matched vendor name or None if no vendor name is present
+    """
+    first_lower = first_lines.lower()
+    for vendor_lower, vendor_name in _VENDOR_LOWER:
+        if vendor_lower in first_lower:
+            app_logger.debug("Found exact vendor name in invoice header")
+            return vendor_name
+    return None
+
 def parse_invoice_text(text, vendor_classifier=None):
     """
     Extract structured data from invoice text with validation and confidence scoring
@@ -120,19 +341,87 @@ def parse_invoice_text(text, vendor_classifier=None):
         dict: Structured invoice data with validation results
     """
     app_logger.info("Parsing invoice text and extracting data")
+    lines = text.splitlines()
     
     # Use ML model if available, otherwise fall back to fuzzy matching
     if vendor_classifier:
         app_logger.debug("Using ML classifier for vendor identification")
         vendor, confidence = vendor_classifier.predict(text[:500])  # Use first 500 chars for classification
     else:
-        app_logger.debug("Using fuzzy matching for vendor identification")
-        # Fuzzy match vendor name from the first few lines
-        first_lines = '\n'.join(text.split('\n')[:5])
-        vendor_match = process.extractOne(first_lines, list(VENDOR_DATABASE.keys()))
-        vendor = vendor_match[0]
-        confidence = vendor_match[1] / 100.0  # Convert to 0-1 scale
+        first_lines = _first_lines(lines)
+        
+        # Invoices usually print the vendor name verbatim, so try an exact lookup first
+        vendor = _exact_vendor_match(first_lines)
+        confidence = 1.0
+        
+        if vendor is None:
+            app_logger.debug("Using fuzzy matching for vendor identification")
+            # Fuzzy match vendor name from the first few lines
+            vendor_match = process.extractOne(first_lines, _VENDOR_KEYS, scorer=fuzz.WRatio,
+                                              processor=utils.default_process, score_cutoff=0)
+            vendor = vendor_match[0]
+            confidence = vendor_match[1] / 100.0  # Convert to 0-1 scale
     
+    return _extract_invoice_data(text, lines, vendor, confidence)
+
+def parse_invoice_texts(texts, vendor_classifier=None):
+    """
+    Extract structured data from a batch of invoice texts
+    
+    Invoices that need fuzzy vendor matching are scored against all known
+    vendors in a single matrix pass instead of one lookup per invoice.
+    
+    Args:
+        texts (list): OCR-extracted texts, one per invoice
+        vendor_classifier (VendorClassifier, optional): Trained classifier for vendor identification
+        
+    Returns:
+        list: Structured invoice data with validation results, in the same order as texts
+    """
+    app_logger.info(f"Parsing batch of {len(texts)} invoice texts")
+    lines_list = [text.splitlines() for text in texts]
+    
+    if vendor_classifier:
+        app_logger.debug("Using ML classifier for vendor identification")
+        vendors = [vendor_classifier.predict(text[:500]) for text in texts]
+    else:
+        vendors = [None] * len(texts)
+        unmatched = []
+        
+        for i, lines in enumerate(lines_list):
+            first_lines = _first_lines(lines)
+            vendor = _exact_vendor_match(first_lines)
+            if vendor is None:
+                unmatched.append((i, first_lines))
+            else:
+                vendors[i] = (vendor, 1.0)
+        
+        if unmatched:
+            app_logger.debug(f"Using fuzzy matching for {len(unmatched)} vendors")
+            # Double precision, so confidences equal extractOne's in parse_invoice_text
+            scores = process.cdist([first_lines for _, first_lines in unmatched], _VENDOR_KEYS,
+                                   scorer=fuzz.WRatio, processor=utils.default_process,
+                                   dtype=np.float64, workers=-1)
+            for (i, _), row in zip(unmatched, scores):
+                best = int(row.argmax())
+                vendors[i] = (_VENDOR_KEYS[best], float(row[best]) / 100.0)  # Convert to 0-1 scale
+    
+    return [_extract_invoice_data(text, lines, vendor, confidence)
+            for text, lines, (vendor, confidence) in zip(texts, lines_list, vendors)]
+
+def _extract_invoice_data(text, lines, vendor, confidence):
+    """
+    Extract and validate invoice fields once the vendor is known
+    
+    Args:
+        text (str): OCR-extracted text from the invoice
+        lines (list): Lines of the invoice text
+        vendor (str): Identified vendor name
+        confidence (float): Vendor identification confidence
+        
+    Returns:
+        dict: Structured invoice data with validation results
+    """
     app_logger.debug(f"Identified vendor: {vendor} with confidence: {confidence:.2f}")
     
     # Dictionary to store all extracted data and confidence scores
@@ -150,10 +439,9 @@ def parse_invoice_text(text, vendor_classifier=None):
             "status": "Pending Review"
         }
     }
-    # Add this debug section to see what's being extracted
-    print("===== RAW EXTRACTED TEXT =====")
-    print(text)
-    print("=============================")
+    # Dump the raw text only when debugging extraction
+    if app_logger.isEnabledFor(logging.DEBUG):
+        app_logger.debug("RAW EXTRACTED TEXT:\n%s", text)
         
     # Add a safety check for empty or very short text
     if not text or len(text) < 50:
@@ -161,142 +449,79 @@ def parse_invoice_text(text, vendor_classifier=None):
         result["validation"]["status"] = "Manual Processing Required"
         return result
     
-    # More sophisticated regex patterns for various invoice fields
-    patterns = {
-        "invoice_no": [r'Invoice\s*(?:#|No|Number|num)[:.\s]*\s*([A-Za-z0-9-]+)', 
-                     r'Invoice\s*ID[:.\s]*\s*([A-Za-z0-9-]+)'],
-        "date": [r'(?:Invoice\s*)?Date[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})',
-                r'(?:Invoice\s*)?Date[:.\s]*\s*(\d{1,2}\s+[A-Za-z]+\s+\d{2,4})'],
-        "due_date": [r'Due\s*Date[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})',
-                    r'Payment\s*Due[:.\s]*\s*(\d{1,2}[\/\.-]\d{1,2}[\/\.-]\d{2,4})'],
-        "po_number": [r'P\.?O\.?\s*(?:Number|No|#)?[:.\s]*\s*([A-Za-z0-9-]+)',
-                     r'Purchase\s*Order\s*(?:Number|No|#)?[:.\s]*\s*([A-Za-z0-9-]+)'],
-        "total_amount": [r'(?:Total|Amount\s*Due|Balance\s*Due)[:.\s]*\s*\$?\s*(\d+[,\d]*\.\d+)',
-                       r'(?:Total|Amount\s*Due|Balance\s*Due)[:.\s]*\s*\$?\s*(\d+[,\d]*)']
-    }
-    
     # Extract metadata using the patterns
     app_logger.debug("Extracting metadata fields")
-    for field, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                value = match.group(1).strip()
-                app_logger.debug(f"Extracted {field}: {value}")
-                
-                if field == "total_amount":
-                    value = value.replace(',', '')
-                    try:
-                        value = float(value)
-                    except ValueError:
-                        app_logger.warning(f"Could not convert total amount: {value}")
-                        result["validation"]["warnings"].append(f"Could not convert total amount: {value}")
-                        value = 0.0
-                        
-                result["metadata"][field] = value
-                break
+    # Skip the patterns of fields whose keywords are absent from the text
+    text_lower = text.lower()
+    fields = tuple(field for field, keywords in _FIELD_KEYWORDS.items()
+                   if any(keyword in text_lower for keyword in keywords))
+    
+    matches = {}
+    if fields:
+        for match in _metadata_regex(fields).finditer(text):
+            field, priority = match.lastgroup.rsplit('_', 1)
+            priority = int(priority)
+            # Keep the first match of the highest priority pattern for each field
+            if field not in matches or priority < matches[field][0]:
+                matches[field] = (priority, match.group(match.lastindex + 1))
+    
+    for field in _METADATA_PATTERNS:
+        if field in matches:
+            value = matches[field][1].strip()
+            app_logger.debug(f"Extracted {field}: {value}")
+            
+            if field == "total_amount":
+                value = value.replace(',', '')
+                try:
+                    value = float(value)
+                except ValueError:
+                    app_logger.warning(f"Could not convert total amount: {value}")
+                    result["validation"]["warnings"].append(f"Could not convert total amount: {value}")
+                    value = 0.0
+                    
+            result["metadata"][field] = value
     
     # Log extraction results
-    for field in patterns.keys():
-        if field not in result["metadata"]:
-            app_logger.debug(f"Failed to extract {field}")
+    if app_logger.isEnabledFor(logging.DEBUG):
+        for field in _METADATA_PATTERNS:
+            if field not in result["metadata"]:
+                app_logger.debug(f"Failed to extract {field}")
     
     # Extract itemized section with improved pattern matching
     app_logger.debug("Extracting line items")
     try:
-        # Look for table headers
-        header_patterns = [
-            r'(Item|Description|Product)[\s\t]+(Qty|Quantity)[\s\t]+(Price|Rate|Unit\s*Price)[\s\t]+(Amount|Total)',
-            r'(Description|Item|Product)[\s\t]+(Quantity|Qty)[\s\t]+(Unit\s*Price|Price|Rate)[\s\t]+(Line\s*Total|Total|Amount)'
-        ]
-        
         start_line = -1
         end_line = -1
-        lines = text.split('\n')
         
-        # Find the start of the item table
+        # Single pass over the lines: search for the table header, then for
+        # the end of the table
         for i, line in enumerate(lines):
-            for pattern in header_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
+            if start_line < 0:
+                # Look for table headers
+                if any(pattern.search(line) for pattern in _HEADER_PATTERNS):
                     app_logger.debug(f"Found item table header at line {i}: {line}")
                     start_line = i + 1  # Skip the header line
-                    break
-            if start_line >= 0:
+            elif i > start_line and _TABLE_END_PATTERN.search(line):
+                # End of the table (typically above the subtotal/total section)
+                end_line = i
+                app_logger.debug(f"Found end of item table at line {i}: {line}")
                 break
         
         # If we found a header, try to extract items
         if start_line >= 0:
-            # Find the end of the table (typically above the subtotal/total section)
-            for i in range(start_line + 1, len(lines)):
-                if re.search(r'(Sub)?Total|Tax|Discount|Balance', lines[i], re.IGNORECASE):
-                    end_line = i
-                    app_logger.debug(f"Found end of item table at line {i}: {lines[i]}")
-                    break
-            
             # If no end marker found, use a reasonable number of lines
             if end_line < 0:
-                end_line = min(start_line + 15, len(lines))
+                end_line = min(start_line + _MAX_TABLE_LINES, len(lines))
                 app_logger.debug(f"No explicit end of table found, using line {end_line}")
             
-            # Extract items
-            app_logger.debug(f"Extracting items from lines {start_line} to {end_line}")
-            for i in range(start_line, end_line):
-                line = lines[i].strip()
-                if not line:
-                    continue
-                
-                # Try various item line formats with more flexible matching
-                patterns = [
-                    # Standard format with flexible whitespace and optional currency symbols
-                    r'([A-Za-z0-9\s\-\(\)]+)[\s\t]+(\d+)[\s\t]+[€$]?([\d.,]+)[\s\t]+[€$]?([\d.,]+)',
-                    # Format specifically for Euro currency with flexible whitespace
-                    r'([A-Za-z0-9\s\-\(\)]+)[\s\t]+(\d+)[\s\t]+€([\d.,]+)[\s\t]+€([\d.,]+)',
-                    # Extra flexible pattern to catch more variations
-                    r'([A-Za-z0-9\s\-\(\)]+?)[\s\t]{2,}(\d+)[\s\t]{2,}[€$]?([\d.,]+)[\s\t]{2,}[€$]?([\d.,]+)',
-                    # Most flexible pattern - handles multiple spacing, currency symbols, decimal formats
-                    r'^([A-Za-z0-9\s\-\(\)/&]+?)[\s\t]{1,}(\d+)[\s\t]{1,}[€$]?([\d.,]+)[\s\t]{1,}[€$]?([\d.,]+)$',
-                    # Pattern with stricter whitespace matching
-                    r'^([A-Za-z0-9\s\-\(\)/&]+)\s+(\d+)\s+[€$]?([\d.,]+)\s+[€$]?([\d.,]+)$',
-                    # Extra pattern for tighter matching
-                    r'^(.*?)\s{2,}(\d+)\s{2,}[€$]?([\d.,]+)\s{2,}[€$]?([\d.,]+)$'
-                ]
-                
-                matched = False
-                for pattern in patterns:
-                    match = re.search(pattern, line)
-                    if match:
-                        item, qty, price, total = match.groups()
-                        new_item = {
-                            "description": item.strip(),
-                            "quantity": int(qty),
-                            "unit_price": float(price.replace(',', '.')),  # Handle European decimal format
-                            "total": float(total.replace(',', '.'))  # Handle European decimal format
-                        }
-                        result["items"].append(new_item)
-                        app_logger.debug(f"Extracted item: {new_item['description']}, quantity: {new_item['quantity']}, price: {new_item['unit_price']}, total: {new_item['total']}")
-                        matched = True
-                        break
-                
-                # If no pattern matched, log the line for debugging
-                if not matched and line.strip():
-                    app_logger.warning(f"Could not extract item from line: '{line}'")
-
-            app_logger.info(f"Extracted {len(result['items'])} line items")
+            result["items"] = extract_line_items(lines, start_line, end_line, app_logger)
         else:
             app_logger.debug("No item table header found")
         
         # Extract total section information
         app_logger.debug("Extracting totals section")
-        total_section_patterns = {
-            "subtotal": r'Sub[\s\-]?total[:.\s]*\s*\$?\s*([\d.,]+)',
-            "tax": r'(?:Tax|VAT|GST)[:.\s]*\s*\$?\s*([\d.,]+)',
-            "shipping": r'(?:Shipping|Freight|Delivery)[:.\s]*\s*\$?\s*([\d.,]+)',
-            "discount": r'Discount[:.\s]*\s*\$?\s*([\d.,]+)',
-            "total": r'(?:Total|Balance\s*Due)[:.\s]*\s*\$?\s*([\d.,]+)'
-        }
-        
-        for field, pattern in total_section_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
+        for field, pattern in _TOTAL_PATTERNS.items():
+            match = pattern.search(text)
             if match:
                 try:
                     value = float(match.group(1).replace(',', ''))
@@ -325,7 +550,7 @@ def parse_invoice_text(text, vendor_classifier=None):
     
     # 2. Verify items total matches the invoice total if both are available
     if result["items"] and "total" in result["totals"]:
-        items_total = sum(item["total"] for item in result["items"])
+        items_total = fsum(map(itemgetter("total"), result["items"]))
         invoice_total = result["totals"]["total"]
         
         # Allow for small rounding differences
@@ -341,17 +566,8 @@ def parse_invoice_text(text, vendor_classifier=None):
     # 3. Check for invoice date validity
     if "date" in result["metadata"]:
         try:
-            # Try multiple date formats
-            date_formats = ["%m/%d/%Y", "%d/%m/%Y", "%m-%d-%Y", "%d-%m-%Y", "%m.%d.%Y", "%d.%m.%Y"]
             date_str = result["metadata"]["date"]
-            
-            parsed_date = None
-            for fmt in date_formats:
-                try:
-                    parsed_date = datetime.datetime.strptime(date_str, fmt)
-                    break
-                except ValueError:
-                    continue
+            parsed_date = _parse_date(date_str)
             
             if parsed_date:
                 # Check if date is reasonable (not in the future, not too old)
@@ -380,14 +596,14 @@ def parse_invoice_text(text, vendor_classifier=None):
     app_logger.info(f"Overall confidence score: {overall_confidence:.2f}")
     
     # Set status based on confidence and warnings
-    if overall_confidence >= ML_CONFIDENCE_THRESHOLD and not result["validation"]["warnings"]:
-        result["validation"]["status"] = "Auto-Approved"
-        app_logger.info("Invoice status: Auto-Approved")
-    elif overall_confidence >= 0.6:
-        result["validation"]["status"] = "Needs Review"
-        app_logger.info("Invoice status: Needs Review")
-    else:
-        result["validation"]["status"] = "Manual Processing Required"
-        app_logger.info("Invoice status: Manual Processing Required")
+    has_warnings = bool(result["validation"]["warnings"])
+    status = "Manual Processing Required"
+    for threshold, status_name, allows_warnings in _STATUS_TABLE:
+        if overall_confidence >= threshold and (allows_warnings or not has_warnings):
+            status = status_name
+            break
+    
+    result["validation"]["status"] = status
+    app_logger.info(f"Invoice status: {status}")
     
     return result
\ No newline at end of file
@@ -6,16 +6,130 @@ and exporting data to external formats.
 """
 
 import os
-import json
+import sqlite3
+import functools
+import threading
+import orjson
 import datetime
 import pandas as pd
 
 from invoice_processor.config import DATABASE_PATH
 from invoice_processor.logger import app_logger
 
+# Database columns, in table order
+_COLUMNS = ('invoice_id', 'vendor', 'date', 'amount', 'status',
+            'processed_date', 'json_data', 'confidence_score')
+
+# Columns returned for listings; json_data is only read per invoice
+_SUMMARY_COLUMNS = tuple(col for col in _COLUMNS if col != 'json_data')
+
+# processed_date is stored as text in this format, which sorts and compares chronologically
+_PROCESSED_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Parsed once on load so callers always get a datetime64 processed_date column
+_PARSE_DATES = {'processed_date': _PROCESSED_DATE_FORMAT}
+
+# Listing columns with few distinct values, stored as categoricals in query results
+_CATEGORY_DTYPES = {'vendor': 'category', 'status': 'category'}
+
+# ORDER BY ... NULLS LAST needs SQLite 3.30 or newer; older versions get an IS NULL sort key
+_NULLS_LAST = sqlite3.sqlite_version_info >= (3, 30, 0)
+
+# Previous CSV-backed database, imported once into SQLite if present
+_LEGACY_CSV_PATH = DATABASE_PATH.with_suffix('.csv')
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS invoices (
+        invoice_id TEXT PRIMARY KEY,
+        vendor TEXT,
+        date TEXT,
+        amount REAL,
+        status TEXT,
+        processed_date TEXT,
+        json_data TEXT,
+        confidence_score REAL
+    )
+"""
+
+# Covers every listing column, so filtered and sorted listings are read from the
+# index without touching the json_data pages; leads with processed_date for time ranges
+_CREATE_INDEX_SQL = f"""
+    CREATE INDEX IF NOT EXISTS idx_invoices_summary ON invoices (
+        processed_date, {', '.join(col for col in _SUMMARY_COLUMNS if col != 'processed_date')}
+    )
+"""
+
+# Superseded by idx_invoices_summary
+_DROP_OLD_INDEX_SQL = "DROP INDEX IF EXISTS idx_invoices_processed_date"
+
+_UPSERT_SQL = f"""
+    INSERT INTO invoices ({', '.join(_COLUMNS)})
+    VALUES ({', '.join('?' * len(_COLUMNS))})
+    ON CONFLICT(invoice_id) DO UPDATE SET
+        {', '.join(f'{col}=excluded.{col}' for col in _COLUMNS[1:])}
+"""
+
+_conn = None
+
+# Serialises use of the shared connection across threads, so no statement runs
+# inside another thread's transaction. Also held while the cached listing is
+# checked, read and stored, and while a write commits and invalidates it, so a
+# listing read before a save is never cached after it.
+_lock = threading.RLock()
+
+# Last get_all_invoices() result, as (data_version, DataFrame)
+_invoices_cache = None
+
+# data_version the get_invoice_by_id() cache was filled at
+_invoice_cache_version = None
+
+def _get_conn():
+    """
+    Get the shared database connection, opening it on first use
+    
+    Returns:
+        sqlite3.Connection: Connection in autocommit mode
+    """
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = sqlite3.connect(DATABASE_PATH, isolation_level=None, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+            _conn.execute(_CREATE_TABLE_SQL)
+            _conn.execute(_CREATE_INDEX_SQL)
+            _conn.execute(_DROP_OLD_INDEX_SQL)
+        return _conn
+
+def _invalidate_cache():
+    """Drop the cached invoice listing and invoice details after a write"""
+    global _invoices_cache
+    _invoices_cache = None
+    _load_invoice.cache_clear()
+
+def _import_legacy_csv(conn):
+    """
+    Copy records from the old CSV database into an empty invoices table; call with _lock held
+    
+    Args:
+        conn (sqlite3.Connection): Database connection
+    """
+    if not os.path.exists(_LEGACY_CSV_PATH):
+        return
+    if conn.execute("SELECT 1 FROM invoices LIMIT 1").fetchone():
+        return
+    
+    df = pd.read_csv(_LEGACY_CSV_PATH, dtype={'invoice_id': str})
+    df = df.reindex(columns=list(_COLUMNS)).astype(object).where(df.notna(), None)
+    with conn:
+        conn.execute("BEGIN")
+        conn.executemany(_UPSERT_SQL, df.itertuples(index=False, name=None))
+    _invalidate_cache()
+    app_logger.info(f"Imported {len(df)} records from {_LEGACY_CSV_PATH}")
+
 def initialize_database():
     """
-    Create or verify database file exists
+    Create or verify the database and invoices table exist
     
     Returns:
         bool: True if successful, False if error occurred
@@ -23,20 +137,38 @@ def initialize_database():
     try:
         if not os.path.exists(DATABASE_PATH):
             app_logger.info(f"Creating new database at {DATABASE_PATH}")
-            # Create empty dataframe with necessary columns
-            columns = ['invoice_id', 'vendor', 'date', 'amount', 'status', 
-                       'processed_date', 'json_data', 'confidence_score']
-            df = pd.DataFrame(columns=columns)
-            df.to_csv(DATABASE_PATH, index=False)
-            app_logger.debug("Database created successfully")
-            return True
         else:
             app_logger.debug(f"Using existing database at {DATABASE_PATH}")
-            return True
+        with _lock:
+            _import_legacy_csv(_get_conn())
+        return True
     except Exception as e:
         app_logger.error(f"Error initializing database: {str(e)}")
         return False
 
+def _invoice_record(invoice_data, processed_date):
+    """
+    Build a database row from processed invoice data
+    
+    Args:
+        invoice_data (dict): Processed invoice data
+        processed_date (str): Timestamp to store as processed_date
+        
+    Returns:
+        tuple: Column values in _COLUMNS order
+    """
+    return (
+        invoice_data['metadata'].get('invoice_no', 'Unknown'),
+        invoice_data['vendor']['name'],
+        invoice_data['metadata'].get('date', 'Unknown'),
+        invoice_data['metadata'].get('total_amount',
+            invoice_data['totals'].get('total', 0)),
+        invoice_data['validation']['status'],
+        processed_date,
+        orjson.dumps(invoice_data, option=orjson.OPT_SERIALIZE_NUMPY).decode(),
+        invoice_data['validation']['overall_confidence']
+    )
+
 def save_to_database(invoice_data, pdf_path):
     """
     Save processed invoice to database
@@ -48,108 +180,203 @@ def save_to_database(invoice_data, pdf_path):
     Returns:
         bool: True if successful, False if error occurred
     """
-    app_logger.info("Saving invoice to database")
-    try:
-        # Ensure database exists
-        if not os.path.exists(DATABASE_PATH):
-            app_logger.debug("Database doesn't exist, initializing")
-            initialize_database()
-        
-        # Read existing database
-        df = pd.read_csv(DATABASE_PATH)
-        app_logger.debug(f"Loaded database with {len(df)} existing records")
+    return save_many_to_database([invoice_data])
+
+def save_many_to_database(invoice_data_list):
+    """
+    Save several processed invoices to the database in one transaction
+    
+    Args:
+        invoice_data_list (list): Processed invoice data dictionaries
         
-        # Extract invoice ID for checking duplicates
-        invoice_id = invoice_data['metadata'].get('invoice_no', 'Unknown')
+    Returns:
+        bool: True if successful, False if error occurred
+    """
+    app_logger.info(f"Saving {len(invoice_data_list)} invoice(s) to database")
+    try:
+        processed_date = datetime.datetime.now().strftime(_PROCESSED_DATE_FORMAT)
+        records = [_invoice_record(invoice_data, processed_date) for invoice_data in invoice_data_list]
         
-        # Check if this invoice already exists
-        if 'invoice_id' in df.columns and invoice_id in df['invoice_id'].values:
-            app_logger.warning(f"Invoice {invoice_id} already exists in database")
-            # Update existing record
-            idx = df.index[df['invoice_id'] == invoice_id].tolist()[0]
-            
-            df.at[idx, 'vendor'] = invoice_data['vendor']['name']
-            df.at[idx, 'date'] = invoice_data['metadata'].get('date', 'Unknown')
-            df.at[idx, 'amount'] = invoice_data['metadata'].get('total_amount', 
-                                invoice_data['totals'].get('total', 0))
-            df.at[idx, 'status'] = invoice_data['validation']['status']
-            df.at[idx, 'processed_date'] = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            df.at[idx, 'json_data'] = json.dumps(invoice_data)
-            df.at[idx, 'confidence_score'] = invoice_data['validation']['overall_confidence']
-            
-            app_logger.info(f"Updated existing invoice record: {invoice_id}")
-        else:
-            # Create new record
-            new_record = {
-                'invoice_id': invoice_id,
-                'vendor': invoice_data['vendor']['name'],
-                'date': invoice_data['metadata'].get('date', 'Unknown'),
-                'amount': invoice_data['metadata'].get('total_amount', 
-                         invoice_data['totals'].get('total', 0)),
-                'status': invoice_data['validation']['status'],
-                'processed_date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'json_data': json.dumps(invoice_data),
-                'confidence_score': invoice_data['validation']['overall_confidence']
-            }
-            
-            # Append to dataframe
-            df = pd.concat([df, pd.DataFrame([new_record])], ignore_index=True)
-            app_logger.info(f"Added new invoice record: {invoice_id}")
+        # Insert, or update existing records with the same invoice ID
+        with _lock:
+            conn = _get_conn()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(_UPSERT_SQL, records)
+            _invalidate_cache()
         
-        # Save back to CSV
-        df.to_csv(DATABASE_PATH, index=False)
-        app_logger.debug(f"Database saved with {len(df)} total records")
+        app_logger.info(f"Saved invoice records: {', '.join(str(record[0]) for record in records)}")
         return True
     except Exception as e:
         app_logger.error(f"Error saving to database: {str(e)}")
         return False
 
-def get_all_invoices():
+def get_all_invoices(since=None, columns=None):
     """
-    Retrieve all invoices from the database
+    Retrieve all invoices from the database, without the json_data column
+    
+    The unfiltered result is cached until the next save; data_version also
+    changes when another connection writes to the database.
+    
+    Args:
+        since (datetime.datetime, optional): Only return invoices processed at or after this time
+        columns (list, optional): Only return these columns. Defaults to every
+            column except json_data.
     
     Returns:
-        pandas.DataFrame: DataFrame containing all invoices, or empty DataFrame if error
+        pandas.DataFrame: DataFrame containing all invoices, with processed_date
+            as datetime64, or empty DataFrame if error
     """
+    global _invoices_cache
     try:
-        if not os.path.exists(DATABASE_PATH):
-            app_logger.warning("Database file does not exist")
-            return pd.DataFrame()
+        with _lock:
+            conn = _get_conn()
+            
+            # Keep table order and only known columns, since they go into the SQL
+            selected = [col for col in _SUMMARY_COLUMNS if columns is None or col in columns]
+            parse_dates = _PARSE_DATES if 'processed_date' in selected else None
+            query = f"SELECT {', '.join(selected)} FROM invoices"
+            
+            # processed_date compares as text in its stored format
+            if since is not None:
+                df = pd.read_sql_query(f"{query} WHERE processed_date >= ?", conn,
+                                       params=(since.strftime(_PROCESSED_DATE_FORMAT),),
+                                       parse_dates=parse_dates)
+                app_logger.debug(f"Retrieved {len(df)} invoices processed since {since}")
+                return df
+            
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            cache_valid = _invoices_cache is not None and _invoices_cache[0] == data_version
+            
+            # A column subset is cut from the cached table, or read on its own
+            if columns is not None:
+                if cache_valid:
+                    return _invoices_cache[1][selected].copy()
+                df = pd.read_sql_query(query, conn, parse_dates=parse_dates)
+                app_logger.debug(f"Retrieved {len(df)} invoices from database")
+                return df
+            
+            if not cache_valid:
+                df = pd.read_sql_query(query, conn, parse_dates=parse_dates)
+                _invoices_cache = (data_version, df)
+                app_logger.debug(f"Retrieved {len(df)} invoices from database")
+            
+            # Callers add and convert columns, so hand out a copy
+            return _invoices_cache[1].copy()
+    except Exception as e:
+        app_logger.error(f"Error retrieving invoices: {str(e)}")
+        return pd.DataFrame()
+
+def count_invoices():
+    """
+    Count the invoices in the database
+    
+    Returns:
+        int: Number of invoices, or 0 if error
+    """
+    try:
+        with _lock:
+            return _get_conn().execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+    except Exception as e:
+        app_logger.error(f"Error counting invoices: {str(e)}")
+        return 0
+
+def query_invoices(statuses=None, search_text=None, search_columns=(), sort_column=None, descending=False):
+    """
+    Retrieve invoices filtered, searched and sorted by SQLite, without the json_data column
+    
+    Args:
+        statuses (list, optional): Only return invoices with one of these statuses
+        search_text (str, optional): Case-insensitive substring to look for
+        search_columns (tuple): Columns searched for search_text; a row matches if any contains it
+        sort_column (str, optional): Column to sort by. Unknown columns leave rows in table order.
+        descending (bool): Sort in descending order
+    
+    Returns:
+        pandas.DataFrame: Matching invoices, with processed_date as datetime64 and
+            vendor and status as categoricals, or empty DataFrame if error
+    """
+    try:
+        conditions = []
+        params = []
+        
+        if statuses:
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        
+        # Only known columns go into the SQL; LIKE wildcards in the text are matched literally
+        columns = [col for col in _SUMMARY_COLUMNS if col in search_columns]
+        if search_text and columns:
+            pattern = '%' + search_text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            conditions.append('(' + ' OR '.join(f"{col} LIKE ? ESCAPE '\\'" for col in columns) + ')')
+            params.extend([pattern] * len(columns))
         
-        df = pd.read_csv(DATABASE_PATH)
-        app_logger.debug(f"Retrieved {len(df)} invoices from database")
+        query = f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM invoices"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        # Missing values sort last in either direction. For processed_date, the
+        # leading column of idx_invoices_summary, NULLS LAST lets SQLite read rows
+        # in index order without a separate sort, which an "IS NULL" key prevents
+        if sort_column in _SUMMARY_COLUMNS:
+            direction = 'DESC' if descending else 'ASC'
+            if _NULLS_LAST:
+                query += f" ORDER BY {sort_column} {direction} NULLS LAST"
+            else:
+                query += f" ORDER BY {sort_column} IS NULL, {sort_column} {direction}"
+        
+        with _lock:
+            df = pd.read_sql_query(query, _get_conn(), params=params, parse_dates=_PARSE_DATES)
+        df = df.astype(_CATEGORY_DTYPES)
+        app_logger.debug(f"Query returned {len(df)} invoices")
         return df
     except Exception as e:
-        app_logger.error(f"Error retrieving invoices: {str(e)}")
+        app_logger.error(f"Error querying invoices: {str(e)}")
         return pd.DataFrame()
 
+@functools.lru_cache(maxsize=256)
+def _load_invoice(invoice_id):
+    """
+    Read and parse one invoice's JSON data
+    
+    Args:
+        invoice_id (str): Invoice ID to retrieve
+        
+    Returns:
+        dict: Invoice data or None if not found
+    """
+    with _lock:
+        row = _get_conn().execute(
+            "SELECT json_data FROM invoices WHERE invoice_id = ? LIMIT 1", (invoice_id,)
+        ).fetchone()
+    return None if row is None else orjson.loads(row[0])
+
 def get_invoice_by_id(invoice_id):
     """
     Retrieve a specific invoice by ID
     
+    Recently viewed invoices are served from memory until the next save or a
+    write from another connection, so the result must not be modified.
+    
     Args:
         invoice_id (str): Invoice ID to retrieve
         
     Returns:
         dict: Invoice data or None if not found
     """
+    global _invoice_cache_version
     try:
-        if not os.path.exists(DATABASE_PATH):
-            app_logger.warning("Database file does not exist")
-            return None
-        
-        df = pd.read_csv(DATABASE_PATH)
-        
-        # Find the invoice
-        invoice_row = df[df['invoice_id'] == invoice_id]
-        if invoice_row.empty:
+        with _lock:
+            data_version = _get_conn().execute("PRAGMA data_version").fetchone()[0]
+            if data_version != _invoice_cache_version:
+                _load_invoice.cache_clear()
+                _invoice_cache_version = data_version
+            
+            invoice_data = _load_invoice(invoice_id)
+        if invoice_data is None:
             app_logger.warning(f"Invoice {invoice_id} not found in database")
             return None
         
-        # Get the JSON data
-        json_data = invoice_row.iloc[0]['json_data']
-        invoice_data = json.loads(json_data)
-        
         app_logger.debug(f"Retrieved invoice {invoice_id} from database")
         return invoice_data
     except Exception as e:
@@ -222,8 +449,8 @@ def export_to_accounting_system(invoice_data, output_format="csv"):
         
         elif output_format.lower() == "json":
             filename = os.path.join(export_dir, f"export_{invoice_id}_{timestamp}.json")
-            with open(filename, 'w') as f:
-                json.dump(invoice_data, f, indent=2)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(invoice_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
             app_logger.info(f"Invoice data exported to {filename}")
             return filename
         
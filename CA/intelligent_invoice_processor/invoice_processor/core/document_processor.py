@@ -9,15 +9,54 @@ import pytesseract
 from pdf2image import convert_from_path
 import cv2
 import numpy as np
-from PIL import Image
 import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from invoice_processor.config import TESSERACT_PATH, POPPLER_PATH, OCR_DPI, OCR_LANG, OCR_CONFIG
+try:
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+except ImportError:  # Optional: keeps Tesseract loaded between pages
+    PyTessBaseAPI = None
+
+from invoice_processor.config import TESSERACT_PATH, POPPLER_PATH, OCR_DPI, OCR_LANG, OCR_CONFIG, OCR_USE_ADAPTIVE, PREPROCESS_BACKEND
 from invoice_processor.logger import app_logger
 
 # Configure Tesseract
 pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
 
+# Non-ASCII characters, replaced with spaces in OCR output
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]')
+
+# Spread of coarse background brightness above which a page counts as unevenly lit
+_UNEVEN_LIGHTING_STD = 30
+
+# Run preprocessing through OpenCL (cv2.UMat) when configured and a device is available
+_use_opencl = PREPROCESS_BACKEND == 'opencl' and cv2.ocl.haveOpenCL()
+if PREPROCESS_BACKEND == 'opencl' and not _use_opencl:
+    app_logger.warning("OpenCL not available, preprocessing on CPU")
+
+# Shared OCR worker threads, each holding its own tesserocr API when available
+_ocr_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="ocr")
+_tess_local = threading.local()
+_use_tesserocr = PyTessBaseAPI is not None
+
+def _is_unevenly_lit(gray):
+    """
+    Check whether page brightness varies too much for a single global threshold
+    
+    Args:
+        gray (numpy.ndarray or cv2.UMat): Grayscale page image
+        
+    Returns:
+        bool: True if adaptive thresholding should be used
+    """
+    # Averaging into a 16x16 grid washes out text and keeps the background
+    coarse = cv2.resize(gray, (16, 16), interpolation=cv2.INTER_AREA)
+    if isinstance(coarse, cv2.UMat):
+        coarse = coarse.get()
+    return coarse.std() > _UNEVEN_LIGHTING_STD
+
 def preprocess_image(image):
     """
     Apply image preprocessing techniques to improve OCR quality
@@ -26,28 +65,99 @@ def preprocess_image(image):
         image (PIL.Image): Input image
         
     Returns:
-        PIL.Image: Preprocessed image
+        numpy.ndarray: Preprocessed grayscale image, ready for pytesseract
     """
     app_logger.debug("Preprocessing image")
     try:
-        # Convert to grayscale
-        gray = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
+        # Convert to grayscale unless the page was rendered in grayscale
+        gray = np.asarray(image)
+        is_color = gray.ndim == 3
+        if _use_opencl:
+            gray = cv2.UMat(gray)
+        if is_color:
+            gray = cv2.cvtColor(gray, cv2.COLOR_RGB2GRAY)
         
-        # Apply adaptive thresholding
-        thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
+        # Global Otsu threshold, unless lighting varies across the page
+        if OCR_USE_ADAPTIVE or _is_unevenly_lit(gray):
+            thresh = cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            )
+        else:
+            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
         
-        # Noise removal
-        kernel = np.ones((1, 1), np.uint8)
-        opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-        
-        # Convert back to PIL Image
-        return Image.fromarray(opening)
+        if _use_opencl:
+            thresh = thresh.get()
+        return thresh
     except Exception as e:
         app_logger.error(f"Error in image preprocessing: {str(e)}")
         # Return original image if preprocessing fails
-        return image
+        return np.asarray(image)
+
+def _get_tess_api():
+    """
+    Get this thread's resident Tesseract API
+    
+    Returns:
+        PyTessBaseAPI: API instance, or None if tesserocr is unavailable
+    """
+    global _use_tesserocr
+    if not _use_tesserocr:
+        return None
+    
+    api = getattr(_tess_local, 'api', None)
+    if api is None:
+        try:
+            # Same settings as OCR_CONFIG ('--psm 6 --oem 3')
+            api = PyTessBaseAPI(lang=OCR_LANG, psm=PSM.SINGLE_BLOCK, oem=OEM.DEFAULT)
+        except RuntimeError as e:
+            app_logger.warning(f"tesserocr unavailable, using pytesseract: {str(e)}")
+            _use_tesserocr = False
+            return None
+        _tess_local.api = api
+    return api
+
+def _image_to_string(img):
+    """
+    Run OCR on an image array
+    
+    Args:
+        img (numpy.ndarray): Grayscale or RGB image
+        
+    Returns:
+        str: Recognised text
+    """
+    api = _get_tess_api()
+    if api is None:
+        return pytesseract.image_to_string(img, lang=OCR_LANG, config=OCR_CONFIG)
+    
+    img = np.ascontiguousarray(img)
+    height, width = img.shape[:2]
+    bytes_per_pixel = img.shape[2] if img.ndim == 3 else 1
+    api.SetImageBytes(img.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+    return api.GetUTF8Text()
+
+def _ocr_page(img):
+    """
+    Preprocess one page image and run OCR on it
+    
+    Args:
+        img (PIL.Image): Page image
+        
+    Returns:
+        tuple: (preprocessed image array, extracted text or None if OCR failed)
+    """
+    # Apply preprocessing
+    processed_img = preprocess_image(img)
+    try:
+        # Perform OCR with improved configuration
+        text = _image_to_string(processed_img)
+        
+        # Clean up extracted text to avoid JSON parsing issues
+        text = _NON_ASCII_RE.sub(' ', text)  # Remove non-ASCII chars
+        return processed_img, text
+    except Exception as e:
+        print(f"Error processing an image: {str(e)}")
+        return processed_img, None
 
 def extract_text_from_invoice(pdf_path):
     """
@@ -57,45 +167,28 @@ def extract_text_from_invoice(pdf_path):
         pdf_path (str): Path to the invoice PDF file
         
     Returns:
-        dict: Dictionary containing extracted text, original images, and preprocessed images
+        dict: Dictionary containing extracted text, original images, and preprocessed image arrays
     """
     app_logger.info(f"Extracting text from PDF: {pdf_path}")
     try:
-        # Convert PDF to high-quality images
+        # Convert PDF to grayscale page images
         images = convert_from_path(
             pdf_path,
             poppler_path=POPPLER_PATH,
-            dpi=300
+            dpi=OCR_DPI,
+            grayscale=True,
+            thread_count=os.cpu_count() or 1
         )
         
         if not images:
             print("Warning: No images extracted from PDF")
             return {'text': "", 'images': [], 'preprocessed_images': []}
         
-        extracted_text = ""
-        preprocessed_images = []
+        # OCR pages concurrently
+        results = list(_ocr_executor.map(_ocr_page, images))
         
-        for img in images:
-            try:
-                # Apply preprocessing
-                processed_img = preprocess_image(img)
-                preprocessed_images.append(processed_img)
-                
-                # Perform OCR with improved configuration
-                text = pytesseract.image_to_string(
-                    processed_img,
-                    lang='eng',
-                    config='--psm 6 --oem 3'
-                )
-                
-                # Clean up extracted text to avoid JSON parsing issues
-                text = text.replace('"', '"').replace('"', '"')  # Normalize quotes
-                text = ''.join(c if ord(c) < 128 else ' ' for c in text)  # Remove non-ASCII chars
-                
-                extracted_text += text
-            except Exception as e:
-                print(f"Error processing an image: {str(e)}")
-                continue
+        preprocessed_images = [processed_img for processed_img, _ in results]
+        extracted_text = "".join(text for _, text in results if text is not None)
         
         return {
             'text': extracted_text,
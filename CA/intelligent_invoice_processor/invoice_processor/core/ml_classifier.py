@@ -5,13 +5,17 @@ This module provides a classifier that can identify invoice vendors
 based on text content using machine learning techniques.
 """
 
-import pickle
 import os
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import CountVectorizer
-from fuzzywuzzy import process
+import time
+import hashlib
+import functools
+import numpy as np
+import joblib
+from sklearn.linear_model import SGDClassifier
+from sklearn.feature_extraction.text import HashingVectorizer
+from rapidfuzz import process, fuzz, utils
 
-from invoice_processor.config import MODEL_PATH, ML_TRAIN_SAMPLES_PER_VENDOR
+from invoice_processor.config import MODEL_PATH, MODELS_DIR, ML_TRAIN_SAMPLES_PER_VENDOR, ML_TRAINING_CACHE_TTL
 from invoice_processor.logger import app_logger
 from invoice_processor.data.vendor_database import VENDOR_DATABASE
 
@@ -23,9 +27,14 @@ class VendorClassifier:
     def __init__(self):
         """Initialize the classifier with vectorizer and model"""
         app_logger.debug("Initializing VendorClassifier")
-        self.vectorizer = CountVectorizer(analyzer='word', ngram_range=(1, 2))
-        self.model = RandomForestClassifier(n_estimators=100)
+        # Stateless hashing vectorizer: no vocabulary to fit or pickle
+        self.vectorizer = HashingVectorizer(n_features=2**18, ngram_range=(1, 2), alternate_sign=False)
+        # Linear model with log loss so predict_proba gives a confidence score
+        self.model = SGDClassifier(loss='log_loss', random_state=42)
         self.classes = list(VENDOR_DATABASE.keys())
+        self._processed_classes = [utils.default_process(c) for c in self.classes]
+        # Repeat classifications of the same text are served from memory
+        self._predict_cached = functools.lru_cache(maxsize=1024)(self._predict_uncached)
         
     def train(self, training_data):
         """
@@ -45,16 +54,29 @@ class VendorClassifier:
         app_logger.debug(f"Training data contains {len(unique_labels)} unique vendors")
         
         # Vectorize the text
-        X = self.vectorizer.fit_transform(texts)
+        X = self.vectorizer.transform(texts)
         app_logger.debug(f"Vectorized text with {X.shape[1]} features")
         
         # Train the model
         self.model.fit(X, labels)
+        self._predict_cached.cache_clear()
         app_logger.info("Vendor classifier training complete")
     
     def predict(self, text):
         """
-        Predict vendor from invoice text
+        Predict vendor from invoice text, reusing earlier results for the same text
+        
+        Args:
+            text (str): Invoice text to classify
+            
+        Returns:
+            tuple: (predicted_vendor, confidence_score)
+        """
+        return self._predict_cached(text)
+    
+    def _predict_uncached(self, text):
+        """
+        Run the vectorizer and model on invoice text
         
         Args:
             text (str): Invoice text to classify
@@ -91,9 +113,11 @@ class VendorClassifier:
         """
         # Extract first few lines for matching
         first_lines = '\n'.join(text.split('\n')[:5])
-        vendor_match = process.extractOne(first_lines, self.classes)
-        vendor = vendor_match[0]
-        confidence = vendor_match[1] / 100.0  # Convert to 0-1 scale
+        # Vendor names are normalised once, so only the query is processed here
+        _, score, index = process.extractOne(utils.default_process(first_lines), self._processed_classes,
+                                             scorer=fuzz.WRatio, processor=None, score_cutoff=0)
+        vendor = self.classes[index]
+        confidence = score / 100.0  # Convert to 0-1 scale
         
         app_logger.debug(f"Fuzzy matched vendor: {vendor} with confidence: {confidence:.2f}")
         return vendor, confidence
@@ -111,13 +135,20 @@ class VendorClassifier:
         if path is None:
             path = MODEL_PATH
             
+        # A classifier loaded with load_model may still be reading the old file
+        # through its memory map, so write a new file and swap it into place
+        # rather than rewriting the mapped one
+        tmp_path = f"{path}.{os.getpid()}.tmp"
         try:
             app_logger.info(f"Saving vendor classifier model to {path}")
-            with open(path, 'wb') as f:
-                pickle.dump((self.vectorizer, self.model, self.classes), f)
+            # Uncompressed so load_model can memory-map the weight arrays
+            joblib.dump((self.vectorizer, self.model, self.classes), tmp_path)
+            os.replace(tmp_path, path)
             return True
         except Exception as e:
             app_logger.error(f"Error saving model: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return False
     
     def load_model(self, path=None):
@@ -136,8 +167,9 @@ class VendorClassifier:
         try:
             if os.path.exists(path):
                 app_logger.info(f"Loading vendor classifier model from {path}")
-                with open(path, 'rb') as f:
-                    self.vectorizer, self.model, self.classes = pickle.load(f)
+                self.vectorizer, self.model, self.classes = joblib.load(path, mmap_mode='r')
+                self._processed_classes = [utils.default_process(c) for c in self.classes]
+                self._predict_cached.cache_clear()
                 app_logger.debug(f"Model loaded successfully with {len(self.classes)} vendor classes")
                 return True
             else:
@@ -159,42 +191,53 @@ def generate_training_data(num_samples_per_vendor=ML_TRAIN_SAMPLES_PER_VENDOR):
     """
     app_logger.info(f"Generating {num_samples_per_vendor} training samples per vendor")
     training_data = []
-    
-    import random
+    rng = np.random.default_rng()
+    n = num_samples_per_vendor
     
     # Generate training examples for each vendor
     for vendor_name, vendor_info in VENDOR_DATABASE.items():
-        # Basic invoice template with vendor information
-        template = f"""
+        typical_items = vendor_info['typical_items']
+        
+        # Basic invoice template with vendor information, split around the
+        # parts that vary per sample
+        header = f"""
         {vendor_name}
         {vendor_info['address']}
         Tax ID: {vendor_info['tax_id']}
         
         INVOICE
         
-        Invoice No: INV-{vendor_name[:3].upper()}-12345
-        Date: 03/15/2024
-        Due Date: 04/15/2024
-        PO Number: PO-2024-001
-        
+        Invoice No: INV"""
+        invoice_suffix = f"-{vendor_name[:3].upper()}-12345"
+        footer = f"""        
         Payment Terms: {vendor_info['payment_terms']}
         """
         
+        # Draw the random items for every sample at once
+        item_counts = rng.integers(1, 5, size=n).tolist()
+        item_idx = rng.integers(0, len(typical_items), size=(n, 4)).tolist()
+        qtys = rng.integers(1, 11, size=(n, 4))
+        prices = np.round(rng.uniform(10, 200, size=(n, 4)), 2)
+        totals = (qtys * prices).tolist()
+        qtys = qtys.tolist()
+        prices = prices.tolist()
+        
         # Add some variations of this template
-        for i in range(num_samples_per_vendor):
+        for i in range(n):
             # Slightly modify the text each time
-            variation = template.replace("INV-", f"INV{i}-")
-            variation = variation.replace("03/15/2024", f"03/{15+i if 15+i <= 30 else 15}/2024")
-            variation = variation.replace("PO-2024-001", f"PO-2024-{1000+i}")
+            variation = (
+                f"{header}{i}{invoice_suffix}\n"
+                f"        Date: 03/{15+i if 15+i <= 30 else 15}/2024\n"
+                f"        Due Date: 04/15/2024\n"
+                f"        PO Number: PO-2024-{1000+i}\n"
+                f"{footer}"
+            )
             
             # Add some random items from this vendor's typical items
-            items_section = "\nItems:\n"
-            for _ in range(random.randint(1, 4)):
-                item = random.choice(vendor_info['typical_items'])
-                qty = random.randint(1, 10)
-                price = round(random.uniform(10, 200), 2)
-                total = qty * price
-                items_section += f"{item} {qty} ${price:.2f} ${total:.2f}\n"
+            items_section = "\nItems:\n" + "".join(
+                f"{typical_items[item_idx[i][j]]} {qtys[i][j]} ${prices[i][j]:.2f} ${totals[i][j]:.2f}\n"
+                for j in range(item_counts[i])
+            )
             
             variation += items_section
             
@@ -202,4 +245,41 @@ def generate_training_data(num_samples_per_vendor=ML_TRAIN_SAMPLES_PER_VENDOR):
             training_data.append((variation, vendor_name))
     
     app_logger.debug(f"Generated {len(training_data)} total training examples")
+    return training_data
+
+def cached_training_data(num_samples_per_vendor=ML_TRAIN_SAMPLES_PER_VENDOR):
+    """
+    Get synthetic training data from the on-disk cache, generating it if missing or expired
+    
+    The cache file is keyed on the vendor database contents and sample count,
+    so editing a vendor regenerates the data instead of reusing stale samples.
+    
+    Args:
+        num_samples_per_vendor (int): Number of samples to generate per vendor
+        
+    Returns:
+        list: List of (text, vendor_name) tuples for training
+    """
+    key = hashlib.sha1(repr((num_samples_per_vendor, VENDOR_DATABASE)).encode()).hexdigest()[:12]
+    cache_path = MODELS_DIR / f"training_data_{key}.pkl"
+    
+    try:
+        if time.time() - cache_path.stat().st_mtime < ML_TRAINING_CACHE_TTL:
+            app_logger.info(f"Loading cached training data from {cache_path}")
+            return joblib.load(cache_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        app_logger.warning(f"Error loading cached training data: {str(e)}")
+    
+    training_data = generate_training_data(num_samples_per_vendor)
+    
+    try:
+        # Replace caches made for an older vendor database
+        for old_path in MODELS_DIR.glob("training_data_*.pkl"):
+            old_path.unlink()
+        joblib.dump(training_data, cache_path)
+    except Exception as e:
+        app_logger.warning(f"Error caching training data: {str(e)}")
+    
     return training_data
\ No newline at end of file
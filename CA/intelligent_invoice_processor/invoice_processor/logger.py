@@ -1,5 +1,8 @@
 import logging
+import logging.handlers
 import os
+import queue
+import atexit
 import datetime
 from pathlib import Path
 
@@ -43,9 +46,14 @@ def setup_logger(name=None, log_level=logging.INFO):
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        # Add handlers to logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Log calls only enqueue records; a background listener does the writing
+        log_queue = queue.Queue(-1)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        atexit.register(listener.stop)
     
     return logger
 
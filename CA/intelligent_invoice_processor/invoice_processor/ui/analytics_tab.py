@@ -6,18 +6,62 @@ This module defines the UI components for the analytics tab.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime, timedelta
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from invoice_processor.logger import app_logger
 from invoice_processor.core.database import get_all_invoices
 
+# Time range options and how many days back each one covers (None for all time)
+_TIME_FILTER_DAYS = {
+    "All Time": None,
+    "Last 7 Days": 7,
+    "Last 30 Days": 30,
+    "Last 90 Days": 90,
+}
+
+# Quiet time after a time range selection before the report is regenerated
+_TIME_FILTER_DEBOUNCE_MS = 250
+
+# Time series longer than this many days are plotted per week instead
+_MAX_DAILY_POINTS = 180
+
+# Figure size in inches for each chart, on screen and when exported
+_CHART_FIGSIZES = {
+    'vendor': (10, 6),
+    'time': (10, 6),
+    'performance': (8, 6),
+    'confidence': (10, 6),
+}
+
+# Invoice columns the charts use
+_ANALYTICS_COLUMNS = ('vendor', 'status', 'confidence_score', 'processed_date')
+
 class AnalyticsTab:
     """Analytics tab for invoice processing visualization"""
     
+    # (pyplot, FigureCanvasTkAgg), imported when the first chart is drawn
+    _mpl = None
+    
+    @classmethod
+    def _lazy_mpl(cls):
+        """
+        Import matplotlib on first use so application startup does not pay for it
+        
+        Returns:
+            tuple: (matplotlib.pyplot module, FigureCanvasTkAgg class)
+        """
+        if cls._mpl is None:
+            import matplotlib.pyplot as plt
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            cls._mpl = (plt, FigureCanvasTkAgg)
+        return cls._mpl
+    
     def __init__(self, parent):
         """
         Initialize the analytics tab
@@ -33,6 +77,36 @@ class AnalyticsTab:
         self.performance_canvas = None
         self.confidence_canvas = None
         
+        # Chart canvases by frame, created on first draw and reused afterwards
+        self._chart_canvases = {}
+        
+        # Data behind each chart on screen, redrawn off screen for export
+        self._chart_data = {}
+        
+        # Guards against overlapping report runs; a run requested meanwhile is
+        # remembered by its refresh flag and started when the current one ends
+        self._analytics_lock = threading.Lock()
+        self._analytics_thread = None
+        self._pending_refresh = None
+        
+        # (invoice count, latest processed date, time range) of the report on screen
+        self._last_key = None
+        
+        # Pending after() call for the last time range selection
+        self._debounce_id = None
+        
+        # Invoices fetched from the database per time range, reused until invalidated
+        self._invoices_cache = {}
+        
+        # Bumped by invalidate_cache(); invoices a report loaded before then are not cached
+        self._cache_generation = 0
+        
+        # Whether the data availability check is out of date
+        self._stale = True
+        
+        # Hands results from the report thread to the Tk main loop
+        self._dispatch = partial(self.parent.after, 0)
+        
         # Setup UI components
         self._setup_ui()
     
@@ -46,7 +120,7 @@ class AnalyticsTab:
         self.content_frame.pack(fill=tk.BOTH, expand=True)
         
         # Analytics title and controls
-        ttk.Label(self.top_frame, text="Invoice Analytics", font=("Arial", 14, "bold")).pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.top_frame, text="Invoice Analytics", style="Title.TLabel").pack(side=tk.LEFT, padx=5)
         ttk.Button(self.top_frame, text="Generate Reports", command=self.generate_analytics).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.top_frame, text="Export Charts", command=self.export_charts).pack(side=tk.LEFT, padx=5)
         
@@ -57,10 +131,10 @@ class AnalyticsTab:
         ttk.Label(self.filter_frame, text="Time Range:").pack(side=tk.LEFT, padx=5)
         self.time_filter = tk.StringVar(value="All Time")
         time_options = ttk.Combobox(self.filter_frame, textvariable=self.time_filter, 
-                                   values=["All Time", "Last 7 Days", "Last 30 Days", "Last 90 Days"], 
+                                   values=list(_TIME_FILTER_DAYS), 
                                    state="readonly", width=15)
         time_options.pack(side=tk.LEFT, padx=5)
-        time_options.bind("<<ComboboxSelected>>", lambda e: self.generate_analytics())
+        time_options.bind("<<ComboboxSelected>>", self._on_time_filter_selected)
         
         # Create notebook for different analytics views
         self.analytics_notebook = ttk.Notebook(self.content_frame)
@@ -97,7 +171,7 @@ class AnalyticsTab:
         # No data message
         self.no_data_label = ttk.Label(self.content_frame, 
                                        text="No invoice data available. Process some invoices first.",
-                                       font=("Arial", 12))
+                                       style="Body.TLabel")
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -105,347 +179,707 @@ class AnalyticsTab:
         status_bar = ttk.Label(self.parent, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.pack(fill=tk.X, side=tk.BOTTOM, pady=(5, 0))
     
-    def check_data_availability(self):
-        """Check if data is available and show appropriate UI"""
+    def _on_time_filter_selected(self, event=None):
+        """
+        Regenerate analytics once the time range selection has settled
+        
+        Args:
+            event (tk.Event, optional): Combobox selection event
+        """
+        if self._debounce_id is not None:
+            self.parent.after_cancel(self._debounce_id)
+        self._debounce_id = self.parent.after(_TIME_FILTER_DEBOUNCE_MS, self._apply_time_filter_selection)
+    
+    def _apply_time_filter_selection(self):
+        """Generate analytics for the selected time range, reusing loaded invoices"""
+        self._debounce_id = None
+        self.generate_analytics(refresh=False)
+    
+    def set_dispatcher(self, dispatcher):
+        """
+        Set the function that runs report results on the Tk main loop
+        
+        Args:
+            dispatcher (callable): Called as dispatcher(callback, *args) from the report thread
+        """
+        self._dispatch = dispatcher
+    
+    def on_invoice_saved(self, invoice_data):
+        """
+        Discard cached invoices after an invoice is saved
+        
+        Args:
+            invoice_data (dict): Saved invoice data
+        """
+        self.invalidate_cache()
+        self._stale = True
+    
+    def refresh_view(self):
+        """Check data availability again if invoices were saved since the last check"""
+        if self._stale:
+            self._stale = False
+            self.check_data_availability()
+    
+    def invalidate_cache(self):
+        """Discard cached invoices so the next report reloads them from the database"""
+        self._invoices_cache.clear()
+        self._cache_generation += 1
+        self._last_key = None
+    
+    def _get_invoices(self, filter_value="All Time", loaded=None):
+        """
+        Get invoices for a time range, querying the database only on a cache miss
+        
+        Args:
+            filter_value (str): Time range option
+            loaded (dict, optional): Collects invoices queried on a cache miss
+                instead of caching them. The report thread passes this, as only
+                the Tk main loop writes the cache.
+            
+        Returns:
+            pandas.DataFrame: Invoices processed within the time range
+        """
+        # A single get(), as the main loop may clear the cache meanwhile
+        df = self._invoices_cache.get(filter_value)
+        if df is None and loaded is not None:
+            df = loaded.get(filter_value)
+        if df is not None:
+            return df
+        
+        days = _TIME_FILTER_DAYS.get(filter_value)
+        since = datetime.now() - timedelta(days=days) if days else None
+        df = get_all_invoices(since=since, columns=_ANALYTICS_COLUMNS)
+        
+        # Low-cardinality columns are counted and grouped on repeatedly
+        for col in ('status', 'vendor'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
+        # Scores are plotted as percentages, so single precision is plenty
+        if 'confidence_score' in df.columns:
+            df['confidence_score'] = pd.to_numeric(df['confidence_score'], downcast='float')
+        
+        if loaded is None:
+            self._invoices_cache[filter_value] = df
+        else:
+            loaded[filter_value] = df
+        return df
+    
+    def check_data_availability(self, df=None):
+        """
+        Check if data is available and show appropriate UI
+        
+        Args:
+            df (pandas.DataFrame, optional): Invoices to check. Defaults to the
+                cached invoices, loading them from the database if needed.
+        
+        Returns:
+            tuple: (data_available, invoice dataframe or None on error)
+        """
         app_logger.debug("Checking data availability for analytics")
         
         try:
-            df = get_all_invoices()
+            if df is None:
+                df = self._get_invoices()
             
             if df.empty:
                 app_logger.debug("No invoice data available for analytics")
                 self.analytics_notebook.pack_forget()
                 self.no_data_label.pack(fill=tk.BOTH, expand=True)
                 self.status_var.set("No invoice data available for analytics")
-                return False
+                return False, df
             else:
                 app_logger.debug(f"Found {len(df)} invoices for analytics")
                 self.no_data_label.pack_forget()
                 self.analytics_notebook.pack(expand=True, fill=tk.BOTH)
-                return True
+                return True, df
                 
         except Exception as e:
             app_logger.error(f"Error checking data availability: {str(e)}")
             self.status_var.set(f"Error: {str(e)}")
-            return False
+            return False, None
     
-    def generate_analytics(self):
-        """Generate analytics visualizations"""
-        app_logger.info("Generating analytics visualizations")
+    def generate_analytics(self, refresh=True):
+        """
+        Generate analytics visualizations
+        
+        The invoices are loaded and aggregated on a background thread so the
+        window stays responsive; the charts are drawn on the Tk main loop once
+        the results are ready.
         
-        if not self.check_data_availability():
+        Args:
+            refresh (bool): Reload invoices from the database. The time filter
+                passes False to reuse invoices already loaded for a time range.
+        """
+        # Run again once the report in progress has been drawn
+        if not self._analytics_lock.acquire(blocking=False):
+            app_logger.debug("Analytics already being generated, queuing another run")
+            self._pending_refresh = bool(self._pending_refresh) or refresh
             return
         
+        app_logger.info("Generating analytics visualizations")
+        
+        if refresh:
+            self.invalidate_cache()
+        
+        self.status_var.set("Generating analytics...")
+        self._analytics_thread = threading.Thread(target=self._compute_all,
+                                                  args=(self.time_filter.get(), self._cache_generation),
+                                                  daemon=True)
+        self._analytics_thread.start()
+    
+    def _compute_all(self, filter_value, generation):
+        """
+        Load invoices and compute chart data, then schedule drawing on the main loop
+        
+        Runs on a background thread and must not touch any Tk widgets.
+        
+        Args:
+            filter_value (str): Time range option
+            generation (int): Cache generation when the report was started
+        """
+        payload = {'loaded': {}, 'generation': generation}
         try:
-            # Get all invoices
-            df = get_all_invoices()
+            # The database applies the time filter
+            df = self._get_invoices(filter_value, payload['loaded'])
+            payload['count'] = len(df)
+            
+            # An empty time range still needs to know whether there is any data at all
+            payload['invoices'] = df if not df.empty else self._get_invoices(loaded=payload['loaded'])
+            
+            # The charts on screen already show these invoices
+            latest = df['processed_date'].max() if 'processed_date' in df.columns else None
+            payload['key'] = (len(df), latest, filter_value)
+            if payload['key'] == self._last_key:
+                payload['unchanged'] = True
+            
+            elif not df.empty:
+                # Per-day aggregates shared by the time, performance and confidence charts
+                daily = self._daily_summary(df)
+                
+                # Points for the time series plots, per day or per week for long histories
+                trend, period = self._trend_summary(daily)
+                
+                # Per-vendor aggregates shared by the vendor and confidence charts
+                vendors = self._vendor_summary(df)
+                
+                payload['vendor'] = self._compute_vendor_chart(vendors)
+                payload['time'] = self._compute_time_chart(trend, period)
+                payload['performance'] = self._compute_performance_metrics(df, daily)
+                payload['confidence'] = self._compute_confidence_analysis(df, trend, period, vendors)
+        except Exception as e:
+            payload['error'] = e
+        
+        self._dispatch(self._render_all, payload)
+    
+    def _render_all(self, payload):
+        """
+        Draw the charts computed by _compute_all
+        
+        Args:
+            payload (dict): Chart data from _compute_all
+        """
+        # Keep the invoices the report loaded, unless a save has invalidated them since
+        if payload['generation'] == self._cache_generation:
+            self._invoices_cache.update(payload['loaded'])
+        
+        try:
+            if 'error' in payload:
+                raise payload['error']
             
-            # Apply time filter
-            df = self._apply_time_filter(df)
+            if payload.get('unchanged'):
+                app_logger.debug("Invoices and time range unchanged, keeping current charts")
+                self.status_var.set(f"Analytics generated successfully with {payload['count']} invoices")
+                return
             
-            if df.empty:
+            self._last_key = None
+            available, _ = self.check_data_availability(payload['invoices'])
+            if not available:
+                return
+            
+            if payload['count'] == 0:
                 app_logger.warning("No data available after filtering")
                 self.status_var.set("No data available for the selected time period")
                 return
             
             # Generate vendor analysis chart
-            self._generate_vendor_chart(df)
+            self._render_vendor_chart(payload['vendor'])
             
             # Generate time analysis chart
-            self._generate_time_chart(df)
+            self._render_time_chart(payload['time'])
             
             # Generate performance metrics
-            self._generate_performance_metrics(df)
+            self._render_performance_metrics(payload['performance'])
             
             # Generate confidence analysis
-            self._generate_confidence_analysis(df)
+            self._render_confidence_analysis(payload['confidence'])
             
-            self.status_var.set(f"Analytics generated successfully with {len(df)} invoices")
+            self._last_key = payload['key']
+            self.status_var.set(f"Analytics generated successfully with {payload['count']} invoices")
             app_logger.info("Analytics generated successfully")
             
         except Exception as e:
             app_logger.error(f"Error generating analytics: {str(e)}")
             self.status_var.set(f"Error generating analytics: {str(e)}")
             messagebox.showerror("Analytics Error", f"An error occurred generating analytics:\n\n{str(e)}")
+        
+        finally:
+            self._analytics_lock.release()
+            
+            # Pick up a report requested while this one was running
+            if self._pending_refresh is not None:
+                refresh, self._pending_refresh = self._pending_refresh, None
+                self.generate_analytics(refresh=refresh)
     
-    def _apply_time_filter(self, df):
+    def _daily_summary(self, df):
         """
-        Apply time filter to dataframe
+        Compute invoice count and average confidence per processing day
         
         Args:
             df (pandas.DataFrame): Invoice dataframe
             
         Returns:
-            pandas.DataFrame: Filtered dataframe
+            pandas.DataFrame: 'count' and 'mean_conf' columns indexed by day,
+                or None if processing dates are not available
         """
-        if 'processed_date' not in df.columns or df.empty:
-            return df
-            
-        filter_value = self.time_filter.get()
+        if 'processed_date' not in df.columns:
+            return None
         
-        if filter_value == "All Time":
-            return df
+        # Rows with invalid dates have no day and are left out of the groups
+        if df['processed_date'].isna().all():
+            return pd.DataFrame({'count': [], 'mean_conf': []})
+        
+        # Bucket the datetime64 values by day, keeping only days with invoices
+        daily = df.resample('D', on='processed_date').agg(count=('confidence_score', 'size'),
+                                                         mean_conf=('confidence_score', 'mean'))
+        return daily[daily['count'] > 0]
+    
+    def _trend_summary(self, daily):
+        """
+        Get the per-day summary, bucketed per week if it has too many days to plot
+        
+        Args:
+            daily (pandas.DataFrame): Per-day summary from _daily_summary, or None
             
-        # Convert to datetime if not already
-        if not pd.api.types.is_datetime64_dtype(df['processed_date']):
-            df['processed_date'] = pd.to_datetime(df['processed_date'], errors='coerce')
+        Returns:
+            tuple: (summary with 'count' and 'mean_conf' columns or None,
+                'day' or 'week')
+        """
+        if daily is None or len(daily) <= _MAX_DAILY_POINTS:
+            return daily, 'day'
         
-        # Get current date
-        now = datetime.now()
+        # Weekly mean confidence is weighted by the invoices processed each day
+        counts = daily['count'].resample('W').sum()
+        confidence = (daily['mean_conf'] * daily['count']).resample('W').sum()
+        return pd.DataFrame({'count': counts, 'mean_conf': confidence / counts}), 'week'
+    
+    def _vendor_summary(self, df):
+        """
+        Compute invoice count and average confidence per vendor
         
-        # Apply filter
-        if filter_value == "Last 7 Days":
-            start_date = now - timedelta(days=7)
-            return df[df['processed_date'] >= start_date]
+        Args:
+            df (pandas.DataFrame): Invoice dataframe
             
-        elif filter_value == "Last 30 Days":
-            start_date = now - timedelta(days=30)
-            return df[df['processed_date'] >= start_date]
+        Returns:
+            pandas.DataFrame: 'count' and, if confidence scores are available,
+                'mean_conf' columns indexed by vendor, or None if vendors are
+                not available
+        """
+        if 'vendor' not in df.columns:
+            return None
+        
+        aggregations = {'count': ('vendor', 'size')}
+        if 'confidence_score' in df.columns:
+            aggregations['mean_conf'] = ('confidence_score', 'mean')
+        return df.groupby('vendor', observed=True).agg(**aggregations)
+    
+    def _clear_chart_frame(self, frame, message=None):
+        """
+        Remove previous content from a chart frame, keeping its canvas for reuse
+        
+        Args:
+            frame (ttk.Frame): Chart frame to clear
+            message (str, optional): Message to show in place of the chart
+        """
+        canvas = self._chart_canvases.get(frame)
+        keep = canvas.get_tk_widget() if canvas is not None else None
+        
+        for widget in frame.winfo_children():
+            if widget is keep:
+                widget.pack_forget()
+            else:
+                widget.destroy()
+        
+        if message:
+            ttk.Label(frame, text=message).pack(pady=20)
+    
+    def _chart_figure(self, frame, figsize):
+        """
+        Get an empty figure for a chart frame, creating its canvas on first use
+        
+        Args:
+            frame (ttk.Frame): Chart frame the canvas is embedded in
+            figsize (tuple): Figure size in inches for a new figure
             
-        elif filter_value == "Last 90 Days":
-            start_date = now - timedelta(days=90)
-            return df[df['processed_date'] >= start_date]
+        Returns:
+            tuple: (matplotlib.figure.Figure, FigureCanvasTkAgg)
+        """
+        canvas = self._chart_canvases.get(frame)
+        if canvas is None:
+            plt, FigureCanvasTkAgg = self._lazy_mpl()
+            canvas = FigureCanvasTkAgg(plt.Figure(figsize=figsize, dpi=100), frame)
+            self._chart_canvases[frame] = canvas
+        else:
+            canvas.figure.clear()
+        return canvas.figure, canvas
+    
+    def _compute_vendor_chart(self, vendors):
+        """
+        Compute vendor analysis chart data
+        
+        Args:
+            vendors (pandas.DataFrame): Per-vendor summary from _vendor_summary, or None
             
-        return df
+        Returns:
+            dict: 'counts' and 'title', or 'message' when there is nothing to plot
+        """
+        if vendors is None:
+            return {'message': "Vendor data not available"}
+        
+        if vendors.empty:
+            return {'message': "No vendor data available"}
+        
+        # Limit to top 10 vendors if there are many
+        vendor_counts = vendors['count'].nlargest(10)
+        if len(vendors) > 10:
+            return {'counts': vendor_counts, 'title': 'Top 10 Vendors by Invoice Count'}
+        return {'counts': vendor_counts, 'title': 'Invoice Count by Vendor'}
     
-    def _generate_vendor_chart(self, df):
+    def _render_vendor_chart(self, data):
         """
-        Generate vendor analysis chart
+        Draw vendor analysis chart
         
         Args:
-            df (pandas.DataFrame): Invoice dataframe
+            data (dict): Chart data from _compute_vendor_chart
         """
         app_logger.debug("Generating vendor analysis chart")
         
-        # Clear previous chart
-        for widget in self.vendor_frame.winfo_children():
-            widget.destroy()
+        # Clear previous chart, showing a message if there is no data
+        self._clear_chart_frame(self.vendor_frame, data.get('message'))
+        if 'message' in data:
+            return
         
         # Create a figure for matplotlib
-        fig = plt.Figure(figsize=(10, 6), dpi=100)
+        fig, canvas = self._chart_figure(self.vendor_frame, _CHART_FIGSIZES['vendor'])
+        self._draw_vendor_chart(fig, data)
+        
+        # Redraw the embedded canvas
+        self.vendor_canvas = canvas
+        self._chart_data['vendor'] = data
+        canvas.draw_idle()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def _draw_vendor_chart(self, fig, data):
+        """
+        Plot vendor analysis chart on a figure
+        
+        Args:
+            fig (matplotlib.figure.Figure): Empty figure to draw on
+            data (dict): Chart data from _compute_vendor_chart
+        """
+        plt = self._lazy_mpl()[0]
         ax = fig.add_subplot(111)
         
-        # Group by vendor and count invoices
-        if 'vendor' in df.columns:
-            vendor_counts = df['vendor'].value_counts()
-            
-            if vendor_counts.empty:
-                # Show message if no data
-                ttk.Label(self.vendor_frame, text="No vendor data available").pack(pady=20)
-                return
-                
-            # Limit to top 10 vendors if there are many
-            if len(vendor_counts) > 10:
-                vendor_counts = vendor_counts.head(10)
-                ax.set_title('Top 10 Vendors by Invoice Count')
-            else:
-                ax.set_title('Invoice Count by Vendor')
-            
-            # Create bar chart
-            vendor_counts.plot(kind='bar', ax=ax)
-            ax.set_xlabel('Vendor')
-            ax.set_ylabel('Number of Invoices')
-            
-            # Rotate x-axis labels for better readability
-            plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
-            
-            # Add value labels on bars
-            for i, v in enumerate(vendor_counts):
-                ax.text(i, v + 0.1, str(v), ha='center')
-            
-            # Adjust layout
-            fig.tight_layout()
+        vendor_counts = data['counts']
+        ax.set_title(data['title'])
+        
+        # Create bar chart
+        bars = ax.bar(vendor_counts.index.astype(str), vendor_counts.to_numpy(), width=0.5)
+        ax.set_xlabel('Vendor')
+        ax.set_ylabel('Number of Invoices')
+        
+        # Rotate x-axis labels for better readability
+        plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+        
+        # Add value labels on bars
+        ax.bar_label(bars, fmt='%d', padding=2)
+        
+        # Adjust layout
+        fig.tight_layout()
+    
+    def _compute_time_chart(self, trend, period):
+        """
+        Compute time analysis chart data
+        
+        Args:
+            trend (pandas.DataFrame): Summary from _trend_summary, or None
+            period (str): 'day' or 'week', the period of each summary row
             
-            # Embed in canvas
-            canvas = FigureCanvasTkAgg(fig, self.vendor_frame)
-            self.vendor_canvas = canvas
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        else:
-            ttk.Label(self.vendor_frame, text="Vendor data not available").pack(pady=20)
+        Returns:
+            dict: 'counts' per period and axis labels, or 'message' when there
+                is nothing to plot
+        """
+        if trend is None:
+            return {'message': "Date data not available"}
+        if trend.empty:
+            return {'message': "No valid date data available"}
+        
+        # Counts per period, already in date order
+        if period == 'week':
+            return {'counts': trend['count'], 'xlabel': 'Week', 'ylabel': 'Invoices per Week'}
+        return {'counts': trend['count'], 'xlabel': 'Date', 'ylabel': 'Number of Invoices'}
     
-    def _generate_time_chart(self, df):
+    def _render_time_chart(self, data):
         """
-        Generate time analysis chart
+        Draw time analysis chart
         
         Args:
-            df (pandas.DataFrame): Invoice dataframe
+            data (dict): Chart data from _compute_time_chart
         """
         app_logger.debug("Generating time analysis chart")
         
-        # Clear previous chart
-        for widget in self.time_frame.winfo_children():
-            widget.destroy()
-        
-        # Create a figure for matplotlib
-        fig = plt.Figure(figsize=(10, 6), dpi=100)
-        ax = fig.add_subplot(111)
+        # Clear previous chart, showing a message if there is no data
+        self._clear_chart_frame(self.time_frame, data.get('message'))
+        if 'message' in data:
+            return
         
-        # Convert date to datetime and sort
         try:
-            if 'processed_date' in df.columns:
-                # Convert to datetime if not already
-                if not pd.api.types.is_datetime64_dtype(df['processed_date']):
-                    df['processed_date'] = pd.to_datetime(df['processed_date'], errors='coerce')
-                
-                # Drop rows with invalid dates
-                df = df.dropna(subset=['processed_date'])
-                
-                if df.empty:
-                    ttk.Label(self.time_frame, text="No valid date data available").pack(pady=20)
-                    return
-                
-                # Sort by date
-                df = df.sort_values('processed_date')
-                
-                # Group by day and count
-                df['date'] = df['processed_date'].dt.date
-                daily_counts = df.groupby('date').size()
-                
-                # Plot time series
-                daily_counts.plot(ax=ax)
-                ax.set_title('Invoices Processed Over Time')
-                ax.set_xlabel('Date')
-                ax.set_ylabel('Number of Invoices')
-                
-                # Format x-axis dates
-                fig.autofmt_xdate()
-                
-                # Add grid for better readability
-                ax.grid(True, linestyle='--', alpha=0.7)
-                
-                # Embed in canvas
-                canvas = FigureCanvasTkAgg(fig, self.time_frame)
-                self.time_canvas = canvas
-                canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            else:
-                ttk.Label(self.time_frame, text="Date data not available").pack(pady=20)
+            # Create a figure for matplotlib
+            fig, canvas = self._chart_figure(self.time_frame, _CHART_FIGSIZES['time'])
+            self._draw_time_chart(fig, data)
+            
+            # Redraw the embedded canvas
+            self.time_canvas = canvas
+            self._chart_data['time'] = data
+            canvas.draw_idle()
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
                 
         except Exception as e:
             app_logger.error(f"Error generating time chart: {str(e)}")
-            ttk.Label(self.time_frame, text=f"Error generating chart: {str(e)}").pack(pady=20)
+            self._clear_chart_frame(self.time_frame, f"Error generating chart: {str(e)}")
     
-    def _generate_performance_metrics(self, df):
+    def _draw_time_chart(self, fig, data):
         """
-        Generate performance metrics visualization
+        Plot time analysis chart on a figure
         
         Args:
-            df (pandas.DataFrame): Invoice dataframe
+            fig (matplotlib.figure.Figure): Empty figure to draw on
+            data (dict): Chart data from _compute_time_chart
         """
-        app_logger.debug("Generating performance metrics")
+        ax = fig.add_subplot(111)
         
-        # Clear previous content
-        for widget in self.perf_frame.winfo_children():
-            widget.destroy()
+        data['counts'].plot(ax=ax)
+        ax.set_title('Invoices Processed Over Time')
+        ax.set_xlabel(data['xlabel'])
+        ax.set_ylabel(data['ylabel'])
         
-        if 'status' not in df.columns or df.empty:
-            ttk.Label(self.perf_frame, text="Status data not available").pack(pady=20)
-            return
+        # Format x-axis dates
+        fig.autofmt_xdate()
         
-        # Create a figure for matplotlib
-        fig = plt.Figure(figsize=(8, 6), dpi=100)
-        ax = fig.add_subplot(111)
+        # Add grid for better readability
+        ax.grid(True, linestyle='--', alpha=0.7)
+    
+    def _compute_performance_metrics(self, df, daily):
+        """
+        Compute performance metrics
+        
+        Args:
+            df (pandas.DataFrame): Invoice dataframe
+            daily (pandas.DataFrame): Per-day summary from _daily_summary, or None
+            
+        Returns:
+            dict: Pie chart slices and summary metric lines, or 'message' when
+                there is nothing to plot
+        """
+        if 'status' not in df.columns or df.empty:
+            return {'message': "Status data not available"}
         
         # Calculate metrics
         total_invoices = len(df)
         
-        # Status counts
+        # Status counts from a single pass over the column
+        counts = df['status'].value_counts()
         status_counts = {
-            'Auto-Approved': len(df[df['status'] == 'Auto-Approved']),
-            'Needs Review': len(df[df['status'] == 'Needs Review']),
-            'Manual Processing Required': len(df[df['status'] == 'Manual Processing Required'])
+            status: int(counts.get(status, 0))
+            for status in ('Auto-Approved', 'Needs Review', 'Manual Processing Required')
         }
         
-        # Create pie chart
-        labels = list(status_counts.keys())
-        sizes = list(status_counts.values())
-        
         # Only include non-zero values
-        non_zero_labels = []
-        non_zero_sizes = []
-        for label, size in zip(labels, sizes):
-            if size > 0:
-                non_zero_labels.append(label)
-                non_zero_sizes.append(size)
-        
-        if not non_zero_sizes:
-            ttk.Label(self.perf_frame, text="No status data available").pack(pady=20)
-            return
-        
-        colors = ['#4CAF50', '#FFC107', '#F44336']
-        explode = (0.1, 0, 0)  # Explode the 1st slice (Auto-Approved)
-        
-        ax.pie(non_zero_sizes, explode=explode[:len(non_zero_sizes)], labels=non_zero_labels, 
-               colors=colors[:len(non_zero_sizes)], autopct='%1.1f%%', startangle=90, shadow=True)
-        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-        ax.set_title('Invoice Processing Performance')
-        
-        # Add legend with counts
-        legend_labels = [f"{label} ({count})" for label, count in zip(non_zero_labels, non_zero_sizes)]
-        ax.legend(legend_labels, loc="best")
-        
-        # Embed in canvas
-        canvas = FigureCanvasTkAgg(fig, self.perf_frame)
-        self.performance_canvas = canvas
-        canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        # Add additional metrics in a frame
-        metrics_frame = ttk.Frame(self.perf_frame)
-        metrics_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10)
-        
-        ttk.Label(metrics_frame, text="Summary Metrics", font=("Arial", 12, "bold")).pack(anchor=tk.W, pady=10)
+        non_zero = [(label, size) for label, size in status_counts.items() if size > 0]
+        if not non_zero:
+            return {'message': "No status data available"}
         
         # Total invoices
-        ttk.Label(metrics_frame, text=f"Total Invoices: {total_invoices}").pack(anchor=tk.W, pady=2)
+        metrics = [f"Total Invoices: {total_invoices}"]
         
         # Auto-approval rate
         auto_rate = (status_counts['Auto-Approved'] / total_invoices * 100) if total_invoices > 0 else 0
-        ttk.Label(metrics_frame, text=f"Auto-Approval Rate: {auto_rate:.1f}%").pack(anchor=tk.W, pady=2)
+        metrics.append(f"Auto-Approval Rate: {auto_rate:.1f}%")
         
         # Manual processing rate
         manual_rate = (status_counts['Manual Processing Required'] / total_invoices * 100) if total_invoices > 0 else 0
-        ttk.Label(metrics_frame, text=f"Manual Processing Rate: {manual_rate:.1f}%").pack(anchor=tk.W, pady=2)
+        metrics.append(f"Manual Processing Rate: {manual_rate:.1f}%")
         
         # Average confidence (if available)
         if 'confidence_score' in df.columns:
             avg_confidence = df['confidence_score'].mean() * 100
-            ttk.Label(metrics_frame, text=f"Average Confidence: {avg_confidence:.1f}%").pack(anchor=tk.W, pady=2)
+            metrics.append(f"Average Confidence: {avg_confidence:.1f}%")
         
         # Processing time metrics (if available)
-        if 'processed_date' in df.columns:
-            # Convert to datetime if not already
-            if not pd.api.types.is_datetime64_dtype(df['processed_date']):
-                df['processed_date'] = pd.to_datetime(df['processed_date'], errors='coerce')
-            
+        if daily is not None:
             # Get processing volume by day
-            df['date'] = df['processed_date'].dt.date
-            daily_counts = df.groupby('date').size()
+            daily_counts = daily['count']
             
             if not daily_counts.empty:
                 avg_per_day = daily_counts.mean()
                 max_per_day = daily_counts.max()
                 
-                ttk.Label(metrics_frame, text=f"Average Invoices/Day: {avg_per_day:.1f}").pack(anchor=tk.W, pady=2)
-                ttk.Label(metrics_frame, text=f"Max Invoices/Day: {max_per_day}").pack(anchor=tk.W, pady=2)
+                metrics.append(f"Average Invoices/Day: {avg_per_day:.1f}")
+                metrics.append(f"Max Invoices/Day: {max_per_day}")
+        
+        return {
+            'labels': [label for label, _ in non_zero],
+            'sizes': [size for _, size in non_zero],
+            'metrics': metrics,
+        }
     
-    def _generate_confidence_analysis(self, df):
+    def _render_performance_metrics(self, data):
         """
-        Generate confidence analysis visualization
+        Draw performance metrics visualization
         
         Args:
-            df (pandas.DataFrame): Invoice dataframe
+            data (dict): Chart data from _compute_performance_metrics
         """
-        app_logger.debug("Generating confidence analysis")
+        app_logger.debug("Generating performance metrics")
+        
+        # Clear previous content, showing a message if there is no data
+        self._clear_chart_frame(self.perf_frame, data.get('message'))
+        if 'message' in data:
+            return
+        
+        # Create a figure for matplotlib
+        fig, canvas = self._chart_figure(self.perf_frame, _CHART_FIGSIZES['performance'])
+        self._draw_performance_metrics(fig, data)
+        
+        # Redraw the embedded canvas
+        self.performance_canvas = canvas
+        self._chart_data['performance'] = data
+        canvas.draw_idle()
+        canvas.get_tk_widget().pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # Add additional metrics in a frame
+        metrics_frame = ttk.Frame(self.perf_frame)
+        metrics_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=10)
         
-        # Clear previous content
-        for widget in self.confidence_frame.winfo_children():
-            widget.destroy()
+        ttk.Label(metrics_frame, text="Summary Metrics", style="Heading.TLabel").pack(anchor=tk.W, pady=10)
         
+        for text in data['metrics']:
+            ttk.Label(metrics_frame, text=text).pack(anchor=tk.W, pady=2)
+    
+    def _draw_performance_metrics(self, fig, data):
+        """
+        Plot performance pie chart on a figure
+        
+        Args:
+            fig (matplotlib.figure.Figure): Empty figure to draw on
+            data (dict): Chart data from _compute_performance_metrics
+        """
+        ax = fig.add_subplot(111)
+        
+        # Create pie chart
+        non_zero_labels = data['labels']
+        non_zero_sizes = data['sizes']
+        
+        colors = ['#4CAF50', '#FFC107', '#F44336']
+        explode = (0.1, 0, 0)  # Explode the 1st slice (Auto-Approved)
+        
+        ax.pie(non_zero_sizes, explode=explode[:len(non_zero_sizes)], labels=non_zero_labels, 
+               colors=colors[:len(non_zero_sizes)], autopct='%1.1f%%', startangle=90, shadow=True)
+        ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+        ax.set_title('Invoice Processing Performance')
+        
+        # Add legend with counts
+        legend_labels = [f"{label} ({count})" for label, count in zip(non_zero_labels, non_zero_sizes)]
+        ax.legend(legend_labels, loc="best")
+    
+    def _compute_confidence_analysis(self, df, trend, period, vendors):
+        """
+        Compute confidence analysis data
+        
+        Args:
+            df (pandas.DataFrame): Invoice dataframe
+            trend (pandas.DataFrame): Summary from _trend_summary, or None
+            period (str): 'day' or 'week', the period of each summary row
+            vendors (pandas.DataFrame): Per-vendor summary from _vendor_summary, or None
+            
+        Returns:
+            dict: Series for the histogram, vendor and trend plots, or 'message'
+                when there is nothing to plot
+        """
         if 'confidence_score' not in df.columns or df.empty:
-            ttk.Label(self.confidence_frame, text="Confidence data not available").pack(pady=20)
+            return {'message': "Confidence data not available"}
+        
+        # 1. Confidence score distribution, as a percentage in a plain float32 array for hist
+        values = (df['confidence_score'].to_numpy(copy=False) * 100.0).astype(np.float32, copy=False)
+        data = {'values': values, 'vendors': None, 'trend': None, 'rolling': None,
+                'period': period}
+        
+        # 2. Average confidence by vendor (top vendors)
+        if vendors is not None:
+            # Top vendors by mean confidence
+            data['vendors'] = vendors['mean_conf'].nlargest(5) * 100
+        
+        # 3. Confidence over time
+        if trend is None:
+            data['trend_title'] = 'Date data not available'
+        else:
+            # Average confidence per period, in date order; weeks without invoices have none
+            df_grouped = (trend['mean_conf'].dropna() * 100).rename('confidence_score')
+            
+            if not df_grouped.empty and len(df_grouped) > 1:
+                data['trend'] = df_grouped
+                
+                # Add rolling average if enough data points
+                if len(df_grouped) > 3:
+                    data['rolling'] = df_grouped.rolling(window=3, min_periods=1).mean()
+            else:
+                data['trend_title'] = 'Not enough time data for trend analysis'
+        
+        return data
+    
+    def _render_confidence_analysis(self, data):
+        """
+        Draw confidence analysis visualization
+        
+        Args:
+            data (dict): Chart data from _compute_confidence_analysis
+        """
+        app_logger.debug("Generating confidence analysis")
+        
+        # Clear previous content, showing a message if there is no data
+        self._clear_chart_frame(self.confidence_frame, data.get('message'))
+        if 'message' in data:
             return
         
         # Create a figure for matplotlib
-        fig = plt.Figure(figsize=(10, 6), dpi=100)
+        fig, canvas = self._chart_figure(self.confidence_frame, _CHART_FIGSIZES['confidence'])
+        self._draw_confidence_analysis(fig, data)
+        
+        # Redraw the embedded canvas
+        self.confidence_canvas = canvas
+        self._chart_data['confidence'] = data
+        canvas.draw_idle()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def _draw_confidence_analysis(self, fig, data):
+        """
+        Plot confidence analysis charts on a figure
+        
+        Args:
+            fig (matplotlib.figure.Figure): Empty figure to draw on
+            data (dict): Chart data from _compute_confidence_analysis
+        """
+        plt = self._lazy_mpl()[0]
         
         # Create subplots
         gs = fig.add_gridspec(2, 2)
@@ -454,26 +888,15 @@ class AnalyticsTab:
         ax3 = fig.add_subplot(gs[1, :])  # Confidence over time
         
         # 1. Confidence score distribution histogram
-        confidence_values = df['confidence_score'] * 100  # Convert to percentage
-        
-        ax1.hist(confidence_values, bins=10, color='skyblue', edgecolor='black')
+        ax1.hist(data['values'], bins=10, color='skyblue', edgecolor='black')
         ax1.set_title('Confidence Score Distribution')
         ax1.set_xlabel('Confidence Score (%)')
         ax1.set_ylabel('Number of Invoices')
         ax1.grid(True, linestyle='--', alpha=0.7)
         
         # 2. Average confidence by vendor (top vendors)
-        if 'vendor' in df.columns:
-            # Group by vendor and calculate mean confidence
-            vendor_confidence = df.groupby('vendor')['confidence_score'].mean() * 100
-            
-            # Sort and get top vendors
-            vendor_confidence = vendor_confidence.sort_values(ascending=False)
-            
-            if len(vendor_confidence) > 5:
-                vendor_confidence = vendor_confidence.head(5)
-            
-            vendor_confidence.plot(kind='bar', ax=ax2, color='lightgreen')
+        if data['vendors'] is not None:
+            data['vendors'].plot(kind='bar', ax=ax2, color='lightgreen')
             ax2.set_title('Avg Confidence by Top Vendors')
             ax2.set_xlabel('Vendor')
             ax2.set_ylabel('Avg Confidence (%)')
@@ -485,50 +908,30 @@ class AnalyticsTab:
             ax2.set_title('Vendor data not available')
         
         # 3. Confidence over time
-        if 'processed_date' in df.columns:
-            # Convert to datetime if not already
-            if not pd.api.types.is_datetime64_dtype(df['processed_date']):
-                df['processed_date'] = pd.to_datetime(df['processed_date'], errors='coerce')
-            
-            # Sort by date
-            df_sorted = df.sort_values('processed_date')
-            
-            # Create 7-day rolling average of confidence
-            df_sorted['date'] = df_sorted['processed_date'].dt.date
-            df_grouped = df_sorted.groupby('date')['confidence_score'].mean() * 100
-            
-            if not df_grouped.empty and len(df_grouped) > 1:
-                # Plot time series
-                df_grouped.plot(ax=ax3, marker='o', linestyle='-', color='orange')
-                
-                # Add rolling average if enough data points
-                if len(df_grouped) > 3:
-                    rolling_avg = df_grouped.rolling(window=3, min_periods=1).mean()
-                    rolling_avg.plot(ax=ax3, linestyle='--', color='red', label='3-day Rolling Avg')
-                
-                ax3.set_title('Confidence Score Over Time')
-                ax3.set_xlabel('Date')
-                ax3.set_ylabel('Avg Confidence Score (%)')
-                ax3.legend()
-                ax3.grid(True, linestyle='--', alpha=0.7)
-            else:
-                ax3.set_title('Not enough time data for trend analysis')
+        if data['trend'] is not None:
+            # Plot time series
+            data['trend'].plot(ax=ax3, marker='o', linestyle='-', color='orange')
+            
+            if data['rolling'] is not None:
+                data['rolling'].plot(ax=ax3, linestyle='--', color='red',
+                                     label=f"3-{data['period']} Rolling Avg")
+            
+            ax3.set_title('Confidence Score Over Time')
+            ax3.set_xlabel('Week' if data['period'] == 'week' else 'Date')
+            ax3.set_ylabel('Avg Confidence Score (%)')
+            ax3.legend()
+            ax3.grid(True, linestyle='--', alpha=0.7)
         else:
-            ax3.set_title('Date data not available')
+            ax3.set_title(data['trend_title'])
         
         # Adjust layout
         fig.tight_layout()
-        
-        # Embed in canvas
-        canvas = FigureCanvasTkAgg(fig, self.confidence_frame)
-        self.confidence_canvas = canvas
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
     def export_charts(self):
         """Export charts to image files"""
         app_logger.info("Exporting analytics charts")
         
-        if not (self.vendor_canvas or self.time_canvas or self.performance_canvas or self.confidence_canvas):
+        if not self._chart_data:
             app_logger.warning("No charts to export")
             messagebox.showwarning("No Charts", "Please generate analytics first.")
             return
@@ -545,33 +948,23 @@ class AnalyticsTab:
             # List to track exported files
             exported_files = []
             
-            # Export vendor chart
-            if self.vendor_canvas:
-                filename = os.path.join(export_dir, f"vendor_analysis_{timestamp}.png")
-                self.vendor_canvas.figure.savefig(filename, dpi=300, bbox_inches='tight')
-                exported_files.append(filename)
-                app_logger.debug(f"Vendor chart exported to {filename}")
-            
-            # Export time chart
-            if self.time_canvas:
-                filename = os.path.join(export_dir, f"time_analysis_{timestamp}.png")
-                self.time_canvas.figure.savefig(filename, dpi=300, bbox_inches='tight')
-                exported_files.append(filename)
-                app_logger.debug(f"Time chart exported to {filename}")
-            
-            # Export performance chart
-            if self.performance_canvas:
-                filename = os.path.join(export_dir, f"performance_metrics_{timestamp}.png")
-                self.performance_canvas.figure.savefig(filename, dpi=300, bbox_inches='tight')
-                exported_files.append(filename)
-                app_logger.debug(f"Performance chart exported to {filename}")
-            
-            # Export confidence chart
-            if self.confidence_canvas:
-                filename = os.path.join(export_dir, f"confidence_analysis_{timestamp}.png")
-                self.confidence_canvas.figure.savefig(filename, dpi=300, bbox_inches='tight')
-                exported_files.append(filename)
-                app_logger.debug(f"Confidence chart exported to {filename}")
+            # Charts to export, skipping any not generated yet
+            jobs = [
+                (key, os.path.join(export_dir, f"{name}_{timestamp}.png"))
+                for key, name in (("vendor", "vendor_analysis"),
+                                  ("time", "time_analysis"),
+                                  ("performance", "performance_metrics"),
+                                  ("confidence", "confidence_analysis"))
+                if key in self._chart_data
+            ]
+            
+            # Render the figures in parallel; each thread draws and saves its own figure
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(self._export_chart, key, filename) for key, filename in jobs]
+                for (_, filename), future in zip(jobs, futures):
+                    future.result()
+                    exported_files.append(filename)
+                    app_logger.debug(f"Chart exported to {filename}")
             
             if exported_files:
                 self.status_var.set(f"Exported {len(exported_files)} charts to {export_dir}")
@@ -585,4 +978,29 @@ class AnalyticsTab:
         except Exception as e:
             app_logger.error(f"Error exporting charts: {str(e)}")
             self.status_var.set(f"Error exporting charts: {str(e)}")
-            messagebox.showerror("Export Error", f"An error occurred exporting charts:\n\n{str(e)}")
\ No newline at end of file
+            messagebox.showerror("Export Error", f"An error occurred exporting charts:\n\n{str(e)}")
+    
+    def _export_chart(self, key, filename):
+        """
+        Redraw a chart on an off-screen Agg figure and save it as a PNG
+        
+        The on-screen Tk canvases are left untouched.
+        
+        Args:
+            key (str): Chart name, a key of _CHART_FIGSIZES
+            filename (str): PNG file to write
+        """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        
+        draw = {
+            'vendor': self._draw_vendor_chart,
+            'time': self._draw_time_chart,
+            'performance': self._draw_performance_metrics,
+            'confidence': self._draw_confidence_analysis,
+        }[key]
+        
+        fig = Figure(figsize=_CHART_FIGSIZES[key], dpi=100)
+        FigureCanvasAgg(fig)
+        draw(fig, self._chart_data[key])
+        fig.savefig(filename, dpi=300, bbox_inches='tight')
\ No newline at end of file
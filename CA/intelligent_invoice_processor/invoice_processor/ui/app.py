@@ -5,14 +5,69 @@ This module defines the main application window and
 integrates the different UI components.
 """
 
+import os
+import queue
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import attrgetter
 
 from invoice_processor.logger import app_logger
+from invoice_processor.core.ml_classifier import VendorClassifier, cached_training_data
 from invoice_processor.ui.process_tab import ProcessTab
 from invoice_processor.ui.database_tab import DatabaseTab
 from invoice_processor.ui.analytics_tab import AnalyticsTab
 
+# Widget styles, applied to the active theme in a single Tcl script
+_STYLE_SETTINGS = {
+    'TFrame': {'configure': {'background': '#f5f5f5'}},
+    'TNotebook': {'configure': {'background': '#f5f5f5'}},
+    'TNotebook.Tab': {
+        'configure': {'padding': [10, 2], 'background': '#e0e0e0'},
+        'map': {'background': [('selected', '#f0f0f0')]},
+    },
+    'TButton': {'configure': {'padding': 6}},
+    # Label fonts, parsed once here instead of per widget from font tuples
+    'Title.TLabel': {'configure': {'font': ('Arial', 14, 'bold')}},
+    'Heading.TLabel': {'configure': {'font': ('Arial', 12, 'bold')}},
+    'Body.TLabel': {'configure': {'font': ('Arial', 12)}},
+}
+
+# Notebook tab indexes
+PROCESS_TAB, DATABASE_TAB, ANALYTICS_TAB = 0, 1, 2
+
+# Menu bar layout: (cascade label, menu attribute, entries). Each entry is
+# (label, dotted path of the command on the app) or None for a separator.
+_MENU_SPEC = (
+    ("File", "file_menu", (
+        ("Select Invoice", "process_tab.select_invoice"),
+        ("Export Data", "process_tab.export_data"),
+        None,
+        ("Exit", "root.quit"),
+    )),
+    ("Tools", "tools_menu", (
+        ("Refresh Database", "_refresh_database"),
+        ("Generate Analytics", "_generate_analytics"),
+        None,
+        ("Retrain Classifier", "_retrain_classifier"),
+    )),
+    ("Help", "help_menu", (
+        ("About", "_show_about"),
+    )),
+)
+
+# Text of the Help > About dialog
+_ABOUT_TEXT = """Intelligent Invoice Processor
+
+Version: 0.1.0
+
+A powerful OCR and machine learning-based solution
+for automating accounts payable invoice processing.
+
+\u00a9 2025 Your Name"""
+
 class InvoiceProcessorApp:
     """Main application window for the Invoice Processor"""
     
@@ -27,17 +82,43 @@ class InvoiceProcessorApp:
         self.root = root
         self.vendor_classifier = vendor_classifier
         
+        # Cleanup functions run when the window closes, see on_close()
+        self._close_hooks = []
+        
+        # Runs classifier retraining off the Tk main thread. Queued jobs are
+        # dropped on close; a retrain already running finishes saving its model.
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self.on_close(partial(self._executor.shutdown, wait=False, cancel_futures=True))
+        
+        # Callbacks by event name, see subscribe() and emit()
+        self._listeners = defaultdict(list)
+        
+        # Pending after_idle() refresh for the selected tab
+        self._refresh_id = None
+        
+        # Pending after() jobs, cancelled when the window closes
+        self._after_ids = set()
+        
+        # Callbacks posted by worker threads, run on the Tk main loop
+        self._results = queue.Queue()
+        self._setup_result_pipe()
+        
         app_logger.debug("Setting up main application window")
         
         # Configure style
         self._setup_style()
         
-        # Create main frame
+        # Create main frame, stretched with the window
         self.main_frame = ttk.Frame(root, padding="10")
-        self.main_frame.pack(fill=tk.BOTH, expand=True)
+        self.main_frame.grid(row=0, column=0, sticky="nsew")
+        root.rowconfigure(0, weight=1)
+        root.columnconfigure(0, weight=1)
         
-        # Create tabs
+        # Create tabs, filling the main frame
         self.tab_control = ttk.Notebook(self.main_frame)
+        self.tab_control.grid(row=0, column=0, sticky="nsew")
+        self.main_frame.rowconfigure(0, weight=1)
+        self.main_frame.columnconfigure(0, weight=1)
         
         # Create tab frames
         self.process_tab_frame = ttk.Frame(self.tab_control)
@@ -48,18 +129,22 @@ class InvoiceProcessorApp:
         self.tab_control.add(self.process_tab_frame, text="Process Invoice")
         self.tab_control.add(self.database_tab_frame, text="Invoice Database")
         self.tab_control.add(self.analytics_tab_frame, text="Analytics")
-        self.tab_control.pack(expand=True, fill=tk.BOTH)
         
-        # Initialize tab content
-        self._setup_tabs()
+        # Tab index by frame path, so the selected tab is found without asking Tk
+        self._tab_index = {
+            str(self.process_tab_frame): PROCESS_TAB,
+            str(self.database_tab_frame): DATABASE_TAB,
+            str(self.analytics_tab_frame): ANALYTICS_TAB,
+        }
         
-        # Set up menu
-        self._setup_menu()
+        # Paint the empty tabbed window first, then build the tab content and
+        # menu once the event loop is idle so the window appears straight away
+        self.root.update_idletasks()
+        self.root.after_idle(self._setup_tabs)
+        self.root.after_idle(self._setup_menu)
         
         # Bind events
         self._bind_events()
-        
-        app_logger.debug("Application setup complete")
     
     def _setup_style(self):
         """Configure application style"""
@@ -70,54 +155,119 @@ class InvoiceProcessorApp:
             self.style.theme_use('clam')
         
         # Configure styles
-        self.style.configure('TFrame', background='#f5f5f5')
-        self.style.configure('TNotebook', background='#f5f5f5')
-        self.style.configure('TNotebook.Tab', padding=[10, 2], background='#e0e0e0')
-        self.style.map('TNotebook.Tab', background=[('selected', '#f0f0f0')])
-        self.style.configure('TButton', padding=6)
+        self.style.theme_settings(self.style.theme_use(), _STYLE_SETTINGS)
     
     def _setup_tabs(self):
         """Initialize tab content"""
-        # Process tab
+        # Process tab, selected at startup
         self.process_tab = ProcessTab(self.process_tab_frame, self.vendor_classifier)
+        self.process_tab.set_save_callback(partial(self.emit, 'invoice_saved'))
+        
+        # Database and analytics tabs are built the first time they are used
+        self.database_tab = None
+        self.analytics_tab = None
+        
+        # Getters for the lazily built tabs by notebook index. A built tab stays
+        # alive for the life of the window; selecting it again only calls its
+        # refresh_view() rather than rebuilding or re-laying out its widgets.
+        self._tab_getters = {DATABASE_TAB: self._get_database_tab, ANALYTICS_TAB: self._get_analytics_tab}
+    
+    def _get_database_tab(self):
+        """
+        Get the database tab, building it on first use
+        
+        Returns:
+            DatabaseTab: Database tab instance
+        """
+        if self.database_tab is None:
+            app_logger.debug("Building database tab")
+            self.database_tab = DatabaseTab(self.database_tab_frame)
+            self.database_tab.set_dispatcher(self.post)
+            self.on_close(self.database_tab.close)
+            self.subscribe('invoice_saved', self.database_tab.on_invoice_saved)
+        return self.database_tab
+    
+    def _get_analytics_tab(self):
+        """
+        Get the analytics tab, building it on first use
         
-        # Database tab
-        self.database_tab = DatabaseTab(self.database_tab_frame)
+        Returns:
+            AnalyticsTab: Analytics tab instance
+        """
+        if self.analytics_tab is None:
+            app_logger.debug("Building analytics tab")
+            self.analytics_tab = AnalyticsTab(self.analytics_tab_frame)
+            self.analytics_tab.set_dispatcher(self.post)
+            
+            # Refresh its data after saves
+            self.subscribe('invoice_saved', self.analytics_tab.on_invoice_saved)
+        return self.analytics_tab
+    
+    def subscribe(self, event, callback):
+        """
+        Register a callback for an application event
         
-        # Analytics tab
-        self.analytics_tab = AnalyticsTab(self.analytics_tab_frame)
+        Args:
+            event (str): Event name, e.g. 'invoice_saved'
+            callback (callable): Called with the event's arguments
+        """
+        self._listeners[event].append(callback)
+    
+    def emit(self, event, *args):
+        """
+        Notify the callbacks registered for an application event
         
-        # Connect tabs for data sharing
-        self.process_tab.set_database_tab(self.database_tab)
-        self.database_tab.set_process_tab(self.process_tab)
+        Args:
+            event (str): Event name
+            *args: Arguments passed to each callback
+        """
+        for callback in self._listeners[event]:
+            callback(*args)
     
     def _setup_menu(self):
         """Set up application menu"""
         self.menu_bar = tk.Menu(self.root)
         
-        # File menu
-        self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.file_menu.add_command(label="Select Invoice", command=self.process_tab.select_invoice)
-        self.file_menu.add_command(label="Export Data", command=self.process_tab.export_data)
-        self.file_menu.add_separator()
-        self.file_menu.add_command(label="Exit", command=self.root.quit)
-        self.menu_bar.add_cascade(label="File", menu=self.file_menu)
-        
-        # Tools menu
-        self.tools_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.tools_menu.add_command(label="Refresh Database", command=self.database_tab.load_database)
-        self.tools_menu.add_command(label="Generate Analytics", command=self.analytics_tab.generate_analytics)
-        self.tools_menu.add_separator()
-        self.tools_menu.add_command(label="Retrain Classifier", command=self._retrain_classifier)
-        self.menu_bar.add_cascade(label="Tools", menu=self.tools_menu)
-        
-        # Help menu
-        self.help_menu = tk.Menu(self.menu_bar, tearoff=0)
-        self.help_menu.add_command(label="About", command=self._show_about)
-        self.menu_bar.add_cascade(label="Help", menu=self.help_menu)
+        # Submenus are populated the first time they are opened
+        self._built_menus = set()
+        for label, attr, entries in _MENU_SPEC:
+            menu = tk.Menu(self.menu_bar, tearoff=0)
+            menu.config(postcommand=partial(self._populate_menu, menu, entries))
+            setattr(self, attr, menu)
+            self.menu_bar.add_cascade(label=label, menu=menu)
         
         self.root.config(menu=self.menu_bar)
     
+    def _populate_menu(self, menu, entries):
+        """
+        Add the entries of a menu spec to a menu, once
+        
+        Args:
+            menu (tk.Menu): Menu to populate
+            entries (tuple): Entries from _MENU_SPEC
+        """
+        if menu in self._built_menus:
+            return
+        self._built_menus.add(menu)
+        
+        # Resolve all commands first so the Tk calls run back to back
+        commands = [None if entry is None else (entry[0], attrgetter(entry[1])(self))
+                    for entry in entries]
+        
+        for entry in commands:
+            if entry is None:
+                menu.add_separator()
+            else:
+                menu.add_command(label=entry[0], command=entry[1])
+    
+    def _refresh_database(self):
+        """Reload the database tab, building it if needed"""
+        self._get_database_tab().load_database()
+    
+    def _generate_analytics(self):
+        """Regenerate the analytics tab, building it if needed"""
+        self._get_analytics_tab().generate_analytics()
+    
     def _bind_events(self):
         """Bind event handlers"""
         # Handle tab change
@@ -133,43 +283,208 @@ class InvoiceProcessorApp:
         Args:
             event: Tab change event
         """
-        current_tab = self.tab_control.index(self.tab_control.select())
+        # Coalesce a burst of tab changes into one refresh of the final tab
+        if self._refresh_id is not None:
+            self.root.after_cancel(self._refresh_id)
+        self._refresh_id = self.root.after_idle(self._refresh_current_tab)
+    
+    def _refresh_current_tab(self):
+        """Let the selected tab reload any data that changed since it was last shown"""
+        self._refresh_id = None
+        current_tab = self._tab_index[str(self.tab_control.select())]
+        
+        # Database and analytics tabs are built on first selection
+        get_tab = self._tab_getters.get(current_tab)
+        if get_tab is not None:
+            get_tab().refresh_view()
+    
+    def _after(self, ms, callback, *args):
+        """
+        Schedule a callback on the Tk event loop, tracked until it runs
         
-        # If changing to Database tab, refresh data
-        if current_tab == 1:  # Database tab
-            self.database_tab.load_database()
+        Args:
+            ms (int): Delay in milliseconds
+            callback (callable): Function to call
+            *args: Arguments passed to the callback
+            
+        Returns:
+            str: Tk after id
+        """
+        def run():
+            self._after_ids.discard(after_id)
+            callback(*args)
         
-        # If changing to Analytics tab, regenerate analytics
-        elif current_tab == 2:  # Analytics tab
-            self.analytics_tab.check_data_availability()
+        after_id = self.root.after(ms, run)
+        self._after_ids.add(after_id)
+        return after_id
+    
+    def _setup_result_pipe(self):
+        """Wake the Tk loop through a pipe when a worker posts a result"""
+        self._pipe = None
+        
+        # Tk file handlers are only available on POSIX; poll the queue elsewhere
+        if not hasattr(self.root.tk, 'createfilehandler'):
+            self._after(50, self._poll_results)
+            return
+        
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        self.root.tk.createfilehandler(read_fd, tk.READABLE, self._on_result_pipe)
+        self._pipe = (read_fd, write_fd)
+        self.on_close(self._close_result_pipe)
+    
+    def post(self, callback, *args):
+        """
+        Run a callback on the Tk main loop; safe to call from any thread
+        
+        Args:
+            callback (callable): Function to call, may update widgets
+            *args: Arguments passed to the callback
+        """
+        self._results.put((callback, args))
+        if self._pipe is not None:
+            try:
+                os.write(self._pipe[1], b'\0')
+            except OSError:
+                # The window has closed and stopped reading
+                pass
+    
+    def _on_result_pipe(self, fd, mask):
+        """
+        Run posted callbacks once a worker has written to the pipe
+        
+        Args:
+            fd (int): Read end of the pipe
+            mask (int): Tk file event mask
+        """
+        try:
+            os.read(fd, 4096)
+        except BlockingIOError:
+            pass
+        self._run_results()
+    
+    def _poll_results(self):
+        """Run posted callbacks and check again shortly; used without file handlers"""
+        self._run_results()
+        self._after(50, self._poll_results)
+    
+    def _run_results(self):
+        """Run every callback posted so far"""
+        while True:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                return
+            
+            # An exception must not escape into Tk's file handler
+            try:
+                callback(*args)
+            except Exception as e:
+                app_logger.error(f"Error in posted callback: {str(e)}")
+    
+    def _close_result_pipe(self):
+        """Stop dispatching worker results when the window closes"""
+        # The write end stays open so a late post() cannot write to a reused
+        # descriptor; it is closed with the process
+        self.root.tk.deletefilehandler(self._pipe[0])
+        os.close(self._pipe[0])
+    
+    def on_close(self, hook):
+        """
+        Register a cleanup function to run when the window closes
+        
+        Args:
+            hook (callable): Called with no arguments before the root window is destroyed
+        """
+        self._close_hooks.append(hook)
     
     def _on_close(self):
         """Handle window close event"""
         app_logger.info("Application closing")
+        
+        # Stop pending callbacks from touching destroyed widgets
+        if self._refresh_id is not None:
+            self.root.after_cancel(self._refresh_id)
+        for after_id in self._after_ids:
+            self.root.after_cancel(after_id)
+        self._after_ids.clear()
+        
+        # One failing hook must not keep the window open
+        for hook in self._close_hooks:
+            try:
+                hook()
+            except Exception as e:
+                app_logger.error(f"Error during close: {str(e)}")
+        
         self.root.destroy()
     
     def _retrain_classifier(self):
-        """Retrain the vendor classifier"""
-        from invoice_processor.core.ml_classifier import generate_training_data
-        
+        """Retrain the vendor classifier on a worker thread"""
         app_logger.info("Retraining vendor classifier")
-        training_data = generate_training_data()
-        self.vendor_classifier.train(training_data)
-        self.vendor_classifier.save_model()
+        
+        # Only one retrain at a time
+        self.tools_menu.entryconfig("Retrain Classifier", state=tk.DISABLED)
+        
+        future = self._executor.submit(self._do_retrain)
+        future.add_done_callback(partial(self.post, self._on_retrain_done))
+    
+    def _do_retrain(self):
+        """
+        Train and save a new classifier; runs on the worker thread
+        
+        The classifier in use keeps serving predictions on the Tk thread
+        until _on_retrain_done() swaps the new one in.
+        
+        Returns:
+            VendorClassifier: Newly trained classifier
+        """
+        training_data = cached_training_data()
+        vendor_classifier = VendorClassifier()
+        vendor_classifier.train(training_data)
+        if not vendor_classifier.save_model():
+            raise RuntimeError("The retrained model could not be saved; see the log for details.")
+        return vendor_classifier
+    
+    def _on_retrain_done(self, future):
+        """
+        Report the result of a finished retrain job
+        
+        Args:
+            future (concurrent.futures.Future): Job submitted by _retrain_classifier
+        """
+        self.tools_menu.entryconfig("Retrain Classifier", state=tk.NORMAL)
+        
+        error = future.exception()
+        if error is not None:
+            app_logger.error(f"Error retraining classifier: {str(error)}")
+            messagebox.showerror("Training Error", f"An error occurred retraining the classifier:\n\n{str(error)}")
+            return
+        
+        # Switch to the new classifier
+        self.vendor_classifier = future.result()
+        self.process_tab.vendor_classifier = self.vendor_classifier
         
         # Show success message
-        tk.messagebox.showinfo("Training Complete", "Vendor classifier has been retrained successfully.")
+        self._info("Training Complete", "Vendor classifier has been retrained successfully.")
     
     def _show_about(self):
         """Show about dialog"""
-        about_text = """
-Intelligent Invoice Processor
-
-Version: 0.1.0
-
-A powerful OCR and machine learning-based solution
-for automating accounts payable invoice processing.
-
-© 2025 Your Name
+        self._info("About", _ABOUT_TEXT)
+    
+    def _info(self, title, text):
+        """
+        Show an information dialog without blocking the main loop
+        
+        Unlike messagebox.showinfo this does not run a nested event loop,
+        so after() callbacks keep firing while the dialog is open.
+        
+        Args:
+            title (str): Dialog title
+            text (str): Message to display
         """
-        tk.messagebox.showinfo("About", about_text)
\ No newline at end of file
+        top = tk.Toplevel(self.root)
+        top.title(title)
+        top.transient(self.root)
+        ttk.Label(top, text=text, padding=12).pack()
+        ttk.Button(top, text="OK", command=top.destroy).pack(pady=6)
+        top.grab_set()
\ No newline at end of file
@@ -6,12 +6,35 @@ This module defines the UI components for the invoice database tab.
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import json
+import orjson
 import os
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from invoice_processor.logger import app_logger
-from invoice_processor.core.database import get_all_invoices, get_invoice_by_id, export_to_accounting_system
+from invoice_processor.core.database import count_invoices, query_invoices, get_invoice_by_id, export_to_accounting_system
+
+# Database columns searched for each "Search in" option
+_SEARCH_COLUMNS = {
+    "All Fields": ('invoice_id', 'vendor', 'date', 'status'),
+    "Invoice #": ('invoice_id',),
+    "Vendor": ('vendor',),
+    "Date": ('date',),
+    "Status": ('status',),
+}
+
+# Quiet time after typing or toggling a filter before the table is refreshed
+_FILTER_DEBOUNCE_MS = 200
+
+# Rows added to the table at a time; more are added as it is scrolled to the end
+_PAGE_SIZE = 200
+
+# Scroll position (fraction of the loaded rows) past which the next page is added
+_LOAD_MORE_AT = 0.9
+
+# Characters of pretty-printed JSON inserted into the details view per idle callback
+_JSON_CHUNK_SIZE = 64 * 1024
 
 class DatabaseTab:
     """Database tab for invoice management"""
@@ -24,19 +47,52 @@ class DatabaseTab:
             parent (ttk.Frame): Parent frame
         """
         self.parent = parent
-        self.process_tab = None  # Will be set later
+        
+        # Whether saved invoices are missing from the table until it is reloaded
+        self._stale = True
+        
+        # Pending after() call for the last search or filter change
+        self._debounce_id = None
+        
+        # Runs database reads off the Tk main thread; results are shown through
+        # the dispatcher, which defaults to a zero-delay after() on the parent
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inv-db')
+        self._dispatch = partial(self.parent.after, 0)
+        
+        # Latest invoice query, its arguments, and whether it was started by load_database()
+        self._query = None
+        self._query_args = None
+        self._reloading = False
         
         # Setup UI components
         self._setup_ui()
     
-    def set_process_tab(self, process_tab):
+    def set_dispatcher(self, dispatcher):
+        """
+        Set the function that runs query results on the Tk main loop
+        
+        Args:
+            dispatcher (callable): Called as dispatcher(callback, *args) from the database thread
+        """
+        self._dispatch = dispatcher
+    
+    def close(self):
+        """Stop the database thread, dropping a query that has not started"""
+        self._io.shutdown(wait=False, cancel_futures=True)
+    
+    def on_invoice_saved(self, invoice_data):
         """
-        Set reference to process tab for data sharing
+        Mark the table for reloading after an invoice is saved
         
         Args:
-            process_tab (ProcessTab): Process tab instance
+            invoice_data (dict): Saved invoice data
         """
-        self.process_tab = process_tab
+        self._stale = True
+    
+    def refresh_view(self):
+        """Reload the table if invoices were saved since it was last loaded"""
+        if self._stale:
+            self.load_database()
     
     def _setup_ui(self):
         """Set up UI components"""
@@ -44,7 +100,7 @@ class DatabaseTab:
         self.control_frame = ttk.Frame(self.parent, padding=10)
         self.control_frame.pack(fill=tk.X)
         
-        ttk.Label(self.control_frame, text="Invoice Database", font=("Arial", 14, "bold")).pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.control_frame, text="Invoice Database", style="Title.TLabel").pack(side=tk.LEFT, padx=5)
         ttk.Button(self.control_frame, text="Refresh Data", command=self.load_database).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.control_frame, text="View Selected Invoice", command=self.view_invoice).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.control_frame, text="Export Selected", command=self.export_selected).pack(side=tk.LEFT, padx=5)
@@ -57,10 +113,12 @@ class DatabaseTab:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var, width=30)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.bind("<KeyRelease>", self._schedule_filters)
         
         self.search_in = tk.StringVar(value="All Fields")
         search_options = ttk.Combobox(self.search_frame, textvariable=self.search_in, values=["All Fields", "Invoice #", "Vendor", "Date", "Status"], state="readonly", width=15)
         search_options.pack(side=tk.LEFT, padx=5)
+        search_options.bind("<<ComboboxSelected>>", self._schedule_filters)
         
         ttk.Button(self.search_frame, text="Search", command=self.search_invoices).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.search_frame, text="Clear", command=self.clear_search).pack(side=tk.LEFT, padx=5)
@@ -72,13 +130,13 @@ class DatabaseTab:
         ttk.Label(self.filter_frame, text="Filter by Status:").pack(side=tk.LEFT, padx=5)
         
         self.show_auto_approved = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.filter_frame, text="Auto-Approved", variable=self.show_auto_approved, command=self.apply_filters).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(self.filter_frame, text="Auto-Approved", variable=self.show_auto_approved, command=self._schedule_filters).pack(side=tk.LEFT, padx=5)
         
         self.show_needs_review = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.filter_frame, text="Needs Review", variable=self.show_needs_review, command=self.apply_filters).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(self.filter_frame, text="Needs Review", variable=self.show_needs_review, command=self._schedule_filters).pack(side=tk.LEFT, padx=5)
         
         self.show_manual = tk.BooleanVar(value=True)
-        ttk.Checkbutton(self.filter_frame, text="Manual Processing", variable=self.show_manual, command=self.apply_filters).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(self.filter_frame, text="Manual Processing", variable=self.show_manual, command=self._schedule_filters).pack(side=tk.LEFT, padx=5)
         
         # Create a frame for the database table
         self.table_frame = ttk.Frame(self.parent, padding=10)
@@ -106,9 +164,9 @@ class DatabaseTab:
         self.invoice_table.column('confidence', width=100)
         self.invoice_table.column('processed_date', width=150)
         
-        # Add a scrollbar
-        table_scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.VERTICAL, command=self.invoice_table.yview)
-        self.invoice_table.configure(yscrollcommand=table_scrollbar.set)
+        # Add a scrollbar, which also pulls in more rows near the end of the table
+        self.table_scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.VERTICAL, command=self.invoice_table.yview)
+        self.invoice_table.configure(yscrollcommand=self._on_table_scroll)
         
         # Add a horizontal scrollbar
         h_scrollbar = ttk.Scrollbar(self.table_frame, orient=tk.HORIZONTAL, command=self.invoice_table.xview)
@@ -117,7 +175,7 @@ class DatabaseTab:
         # Pack the table and scrollbars
         self.invoice_table.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
-        table_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.table_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -137,140 +195,184 @@ class DatabaseTab:
         
         self.invoice_table.bind("<Button-3>", self._show_context_menu)
         
-        # Store the full dataset and current filtered dataset
-        self.full_dataset = pd.DataFrame()
+        # Number of invoices in the database and the invoices currently displayed
+        self.total_invoices = 0
         self.filtered_dataset = pd.DataFrame()
         
+        # Rows of filtered_dataset added to the table so far
+        self._rendered = 0
+        
         # Sort direction
         self.sort_column = 'processed_date'  # Default sort column
         self.sort_reverse = True  # Default sort direction (newest first)
     
     def load_database(self):
-        """Load invoice data from the database and display in the table"""
+        """Reload invoice data from the database and display in the table"""
         app_logger.debug("Loading invoice database")
-        try:
-            # Get all invoices
-            df = get_all_invoices()
-            
-            if df.empty:
-                app_logger.debug("No invoices found in database")
-                self.status_var.set("No invoices found in database")
-                self.full_dataset = df
-                self.filtered_dataset = df
-                
-                # Clear existing data
-                for item in self.invoice_table.get_children():
-                    self.invoice_table.delete(item)
-                    
-                return
-            
-            # Store the full dataset
-            self.full_dataset = df
-            
-            # Apply filters
-            self.apply_filters()
-            
-            app_logger.info(f"Loaded {len(df)} invoices from database")
-            
-        except Exception as e:
-            app_logger.error(f"Error loading database: {str(e)}")
-            self.status_var.set(f"Error loading database: {str(e)}")
-            messagebox.showerror("Database Error", f"An error occurred loading the database:\n\n{str(e)}")
+        self._stale = False
+        self._reloading = True
+        self.apply_filters()
     
     def apply_filters(self):
-        """Apply filters to the dataset and update the display"""
-        if self.full_dataset.empty:
+        """Query the invoices matching the filters on the database thread; the display updates when it finishes"""
+        # This applies any change still waiting in the debounce
+        if self._debounce_id is not None:
+            self.parent.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        
+        app_logger.debug("Applying filters to invoice data")
+        
+        # Filter, search and sort in the database
+        query_args = self._query_settings()
+        
+        # Keys that leave the search text unchanged, or boxes toggled back, reuse
+        # the query already shown or pending; a reload always queries again
+        if query_args == self._query_args and not self._reloading:
             return
+        self._query_args = query_args
+        
+        # A query still waiting for the database thread is superseded by this one
+        if self._query is not None:
+            self._query.cancel()
+        self._query = self._io.submit(self._read_invoices, partial(query_invoices, **query_args))
+        self._query.add_done_callback(partial(self._dispatch, self._on_invoices_read))
+    
+    def _query_settings(self):
+        """
+        Read the filter, search and sort settings; Tk variables may only be used from the main thread
+        
+        Returns:
+            dict: Keyword arguments for query_invoices()
+        """
+        # Apply status filters
+        status_filters = []
+        if self.show_auto_approved.get():
+            status_filters.append("Auto-Approved")
+        if self.show_needs_review.get():
+            status_filters.append("Needs Review")
+        if self.show_manual.get():
+            status_filters.append("Manual Processing Required")
+        
+        return dict(statuses=status_filters,
+                    search_text=self.search_var.get().strip(),
+                    search_columns=_SEARCH_COLUMNS.get(self.search_in.get(), ()),
+                    sort_column=self.sort_column,
+                    descending=self.sort_reverse)
+    
+    def _read_invoices(self, query):
+        """
+        Count the invoices and run the filter query; runs on the database thread
+        
+        Args:
+            query (callable): Returns the filtered invoices as a DataFrame
             
-        app_logger.debug("Applying filters to invoice data")
+        Returns:
+            tuple: Number of invoices in the database and the filtered DataFrame
+        """
+        total = count_invoices()
+        return total, query() if total else pd.DataFrame()
+    
+    def _on_invoices_read(self, future):
+        """
+        Display the result of the latest invoice query
+        
+        Args:
+            future (Future): Finished or cancelled _read_invoices() call
+        """
+        # Results of superseded queries are dropped
+        if future is not self._query:
+            return
+        self._query = None
+        reloading, self._reloading = self._reloading, False
         
         try:
-            # Start with the full dataset
-            df = self.full_dataset.copy()
-            
-            # Apply status filters
-            status_filters = []
-            if self.show_auto_approved.get():
-                status_filters.append("Auto-Approved")
-            if self.show_needs_review.get():
-                status_filters.append("Needs Review")
-            if self.show_manual.get():
-                status_filters.append("Manual Processing Required")
+            self.total_invoices, df = future.result()
             
-            if status_filters:
-                df = df[df['status'].isin(status_filters)]
-            
-            # Apply search if provided
-            search_text = self.search_var.get().strip().lower()
-            if search_text:
-                search_field = self.search_in.get()
-                
-                if search_field == "All Fields":
-                    # Search in all string columns
-                    mask = False
-                    for col in ['invoice_id', 'vendor', 'date', 'status']:
-                        if col in df.columns:
-                            mask = mask | df[col].astype(str).str.lower().str.contains(search_text, na=False)
-                    df = df[mask]
-                elif search_field == "Invoice #":
-                    df = df[df['invoice_id'].astype(str).str.lower().str.contains(search_text, na=False)]
-                elif search_field == "Vendor":
-                    df = df[df['vendor'].astype(str).str.lower().str.contains(search_text, na=False)]
-                elif search_field == "Date":
-                    df = df[df['date'].astype(str).str.lower().str.contains(search_text, na=False)]
-                elif search_field == "Status":
-                    df = df[df['status'].astype(str).str.lower().str.contains(search_text, na=False)]
-            
-            # Store the filtered dataset
+            # Store and display the filtered dataset
             self.filtered_dataset = df
+            self._render()
             
-            # Sort the data
-            if self.sort_column in df.columns:
-                df = df.sort_values(by=self.sort_column, ascending=not self.sort_reverse)
-            
-            # Clear existing data
-            for item in self.invoice_table.get_children():
-                self.invoice_table.delete(item)
-            
-            # Add filtered data to table
-            for _, row in df.iterrows():
-                confidence = row.get('confidence_score', 0) * 100
-                
-                # Format amount with currency symbol
-                try:
-                    amount = float(row['amount'])
-                    amount_str = f"${amount:.2f}"
-                except (ValueError, TypeError):
-                    amount_str = row['amount']
-                
-                # Insert into table
-                self.invoice_table.insert('', tk.END, values=(
-                    row['invoice_id'],
-                    row['vendor'],
-                    row['date'],
-                    amount_str,
-                    row['status'],
-                    f"{confidence:.1f}%",
-                    row['processed_date']
-                ))
+            if not self.total_invoices:
+                app_logger.debug("No invoices found in database")
+                self.status_var.set("No invoices found in database")
+                return
             
             # Update status bar
-            self.status_var.set(f"{len(df)} invoices displayed (filtered from {len(self.full_dataset)})")
+            self.status_var.set(f"{len(df)} invoices displayed (filtered from {self.total_invoices})")
             app_logger.debug(f"Applied filters: {len(df)} invoices displayed")
+            if reloading:
+                app_logger.info(f"Loaded {self.total_invoices} invoices from database")
             
         except Exception as e:
-            app_logger.error(f"Error applying filters: {str(e)}")
-            self.status_var.set(f"Error applying filters: {str(e)}")
+            # Let the same filters be tried again
+            self._query_args = None
+            if reloading:
+                app_logger.error(f"Error loading database: {str(e)}")
+                self.status_var.set(f"Error loading database: {str(e)}")
+                messagebox.showerror("Database Error", f"An error occurred loading the database:\n\n{str(e)}")
+            else:
+                app_logger.error(f"Error applying filters: {str(e)}")
+                self.status_var.set(f"Error applying filters: {str(e)}")
+    
+    def _render(self):
+        """Replace the table contents with the first page of the filtered dataset"""
+        # Clear existing data
+        for item in self.invoice_table.get_children():
+            self.invoice_table.delete(item)
+        
+        # Add the first page of filtered data to the table
+        self._rendered = 0
+        self._render_page()
+    
+    def _render_page(self):
+        """Add the next page of the filtered dataset to the table"""
+        df = self.filtered_dataset.iloc[self._rendered:self._rendered + _PAGE_SIZE]
+        self._rendered += len(df)
+        if df.empty:
+            return
+        
+        # Format amount with currency symbol, keeping values that are not numbers as they are
+        amount = pd.to_numeric(df['amount'], errors='coerce')
+        amount_str = amount.map('${:.2f}'.format).where(amount.notna(), df['amount'])
+        confidence_str = (df['confidence_score'] * 100).map('{:.1f}%'.format)
+        
+        # Insert into table
+        for values in zip(df['invoice_id'], df['vendor'], df['date'], amount_str,
+                          df['status'], confidence_str, df['processed_date']):
+            self.invoice_table.insert('', tk.END, values=values)
+    
+    def _on_table_scroll(self, first, last):
+        """
+        Update the scrollbar and add another page when the end of the loaded rows comes into view
+        
+        Args:
+            first (str): Fraction of the rows above the visible area
+            last (str): Fraction of the rows up to the bottom of the visible area
+        """
+        self.table_scrollbar.set(first, last)
+        if float(last) > _LOAD_MORE_AT and self._rendered < len(self.filtered_dataset):
+            self._render_page()
+    
+    def _schedule_filters(self, event=None):
+        """
+        Apply the filters once typing or toggling has settled
+        
+        Args:
+            event (tk.Event, optional): Key release event from the search field
+        """
+        if self._debounce_id is not None:
+            self.parent.after_cancel(self._debounce_id)
+        self._debounce_id = self.parent.after(_FILTER_DEBOUNCE_MS, self.apply_filters)
     
     def search_invoices(self):
         """Apply the search filter"""
         app_logger.debug(f"Searching invoices with text: {self.search_var.get()}")
-        self.apply_filters()
+        self._schedule_filters()
     
     def clear_search(self):
         """Clear the search field and refresh the view"""
         self.search_var.set("")
-        self.apply_filters()
+        self._schedule_filters()
     
     def view_invoice(self):
         """View details of the selected invoice from the database"""
@@ -300,8 +402,8 @@ class DatabaseTab:
                 metadata_frame.pack(fill=tk.X)
                 
                 # Invoice ID and vendor
-                ttk.Label(metadata_frame, text=f"Invoice #: {invoice_id}", font=("Arial", 12, "bold")).grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
-                ttk.Label(metadata_frame, text=f"Vendor: {invoice_data['vendor']['name']}", font=("Arial", 12)).grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
+                ttk.Label(metadata_frame, text=f"Invoice #: {invoice_id}", style="Heading.TLabel").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
+                ttk.Label(metadata_frame, text=f"Vendor: {invoice_data['vendor']['name']}", style="Body.TLabel").grid(row=0, column=1, sticky=tk.W, padx=5, pady=2)
                 
                 # Date and amount
                 date = invoice_data['metadata'].get('date', 'Unknown')
@@ -331,8 +433,18 @@ class DatabaseTab:
                 json_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
                 json_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
                 
-                # Insert the formatted JSON data
-                json_text.insert(tk.END, json.dumps(invoice_data, indent=2))
+                # Format the JSON data the first time its tab is shown and stream it in
+                json_pending = True
+                
+                def show_json(event=None):
+                    nonlocal json_pending
+                    if json_pending and str(notebook.select()) == str(json_frame):
+                        json_pending = False
+                        text = orjson.dumps(invoice_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+                        self._stream_json(json_text, text)
+                
+                notebook.bind("<<NotebookTabChanged>>", show_json)
+                details_window.after_idle(show_json)
                 
                 # Items tab if there are line items
                 if invoice_data['items']:
@@ -363,14 +475,13 @@ class DatabaseTab:
                     items_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
                     items_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
                     
-                    # Add items to table
-                    for item in invoice_data['items']:
-                        items_table.insert('', tk.END, values=(
-                            item['description'],
-                            item['quantity'],
-                            f"${item['unit_price']:.2f}",
-                            f"${item['total']:.2f}"
-                        ))
+                    # Format all rows first, then add them to the table in one tight loop
+                    item_rows = [
+                        (item['description'], item['quantity'], f"${item['unit_price']:.2f}", f"${item['total']:.2f}")
+                        for item in invoice_data['items']
+                    ]
+                    for values in item_rows:
+                        items_table.insert('', tk.END, values=values)
                 
                 # Validation tab
                 validation_frame = ttk.Frame(notebook)
@@ -410,6 +521,23 @@ class DatabaseTab:
             self.status_var.set(f"Error viewing invoice details: {str(e)}")
             messagebox.showerror("View Error", f"An error occurred viewing invoice details:\n\n{str(e)}")
     
+    def _stream_json(self, text_widget, text, start=0):
+        """
+        Insert the next piece of formatted JSON and schedule the rest for when the UI is idle
+        
+        Args:
+            text_widget (tk.Text): Text widget receiving the JSON
+            text (str): Formatted JSON
+            start (int): Offset of the first character not yet inserted
+        """
+        if not text_widget.winfo_exists():
+            return
+        
+        end = start + _JSON_CHUNK_SIZE
+        text_widget.insert(tk.END, text[start:end])
+        if end < len(text):
+            text_widget.after_idle(self._stream_json, text_widget, text, end)
+    
     def export_selected(self):
         """Export the selected invoice to a file"""
         selected_item = self.invoice_table.selection()
@@ -558,8 +686,22 @@ class DatabaseTab:
             self.sort_column = column
             self.sort_reverse = False
         
-        # Apply filters with new sort
-        self.apply_filters()
+        # Only the loaded rows need reordering if they match the other settings;
+        # query again if those changed, a query is on its way, or the column is
+        # not in the listing
+        query_args = self._query_settings()
+        unsorted = dict(query_args, sort_column=None, descending=False)
+        if (self._query is not None or self._query_args is None
+                or dict(self._query_args, sort_column=None, descending=False) != unsorted
+                or self.sort_column not in self.filtered_dataset):
+            self.apply_filters()
+            return
+        
+        # Missing values go last in either direction, as in the database query
+        self._query_args = query_args
+        self.filtered_dataset = self.filtered_dataset.sort_values(self.sort_column, ascending=not self.sort_reverse,
+                                                                  na_position='last', kind='stable')
+        self._render()
     
     def _show_context_menu(self, event):
         """
@@ -29,7 +29,7 @@ class ProcessTab:
         """
         self.parent = parent
         self.vendor_classifier = vendor_classifier
-        self.database_tab = None  # Will be set later
+        self.save_callback = None  # Will be set later
         
         # Variables for storing current invoice data
         self.current_pdf_path = None
@@ -40,14 +40,14 @@ class ProcessTab:
         # Setup UI components
         self._setup_ui()
     
-    def set_database_tab(self, database_tab):
+    def set_save_callback(self, callback):
         """
-        Set reference to database tab for data sharing
+        Set a function to call after an invoice has been saved
         
         Args:
-            database_tab (DatabaseTab): Database tab instance
+            callback (callable): Called with the saved invoice data after each successful save
         """
-        self.database_tab = database_tab
+        self.save_callback = callback
     
     def _setup_ui(self):
         """Set up UI components"""
@@ -62,7 +62,7 @@ class ProcessTab:
         self.bottom_frame.pack(fill=tk.X)
         
         # Top frame controls
-        ttk.Label(self.top_frame, text="Invoice Processing", font=("Arial", 14, "bold")).pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.top_frame, text="Invoice Processing", style="Title.TLabel").pack(side=tk.LEFT, padx=5)
         
         ttk.Button(self.top_frame, text="Select Invoice PDF", command=self.select_invoice).pack(side=tk.LEFT, padx=5)
         ttk.Button(self.top_frame, text="Process Invoice", command=self.process_invoice).pack(side=tk.LEFT, padx=5)
@@ -77,7 +77,7 @@ class ProcessTab:
         self.right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
         # Image preview area
-        ttk.Label(self.left_frame, text="Document Preview", font=("Arial", 12, "bold")).pack(anchor=tk.W)
+        ttk.Label(self.left_frame, text="Document Preview", style="Heading.TLabel").pack(anchor=tk.W)
         self.image_frame = ttk.Frame(self.left_frame, borderwidth=1, relief=tk.SUNKEN)
         self.image_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
@@ -85,7 +85,7 @@ class ProcessTab:
         self.image_label.pack(fill=tk.BOTH, expand=True)
         
         # Extracted data display
-        ttk.Label(self.right_frame, text="Extracted Data", font=("Arial", 12, "bold")).pack(anchor=tk.W)
+        ttk.Label(self.right_frame, text="Extracted Data", style="Heading.TLabel").pack(anchor=tk.W)
         
         # Create a frame for the results
         result_frame = ttk.Frame(self.right_frame)
@@ -230,10 +230,10 @@ class ProcessTab:
             self.status_var.set("Invoice saved to database successfully.")
             app_logger.info("Invoice saved successfully")
             
-            # Refresh the database display if available
-            if self.database_tab:
-                self.database_tab.load_database()
-                
+            # Let the app notify the other tabs
+            if self.save_callback:
+                self.save_callback(self.current_invoice_data)
+            
             # Show success message
             messagebox.showinfo("Success", "Invoice saved to database successfully.")
         else:
@@ -5,7 +5,7 @@ This module provides helper functions for exporting invoice data.
 """
 
 import os
-import json
+import orjson
 import datetime
 import pandas as pd
 import csv
@@ -105,8 +105,8 @@ def export_to_json(invoice_data, output_path=None):
             output_path = os.path.join(export_dir, f"invoice_{invoice_id}_{timestamp}.json")
         
         # Write to JSON file
-        with open(output_path, 'w') as f:
-            json.dump(invoice_data, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(invoice_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         
         app_logger.info(f"Invoice data exported to {output_path}")
         return output_path
@@ -6,7 +6,7 @@ This module provides helper functions for data validation.
 
 import re
 import datetime
-from fuzzywuzzy import process
+from rapidfuzz import process, fuzz, utils
 
 from invoice_processor.logger import app_logger
 
@@ -162,7 +162,8 @@ def validate_vendor(vendor_name):
         return True, 0.5, "No known vendors to match against", vendor_name
     
     # Try to match against known vendors using fuzzy matching
-    match, score = process.extractOne(vendor_name, known_vendors)
+    match, score, _ = process.extractOne(vendor_name, known_vendors, scorer=fuzz.WRatio,
+                                         processor=utils.default_process, score_cutoff=0)
     confidence = score / 100.0  # Convert to 0-1 scale
     
     if confidence >= 0.9:
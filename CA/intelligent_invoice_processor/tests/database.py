@@ -0,0 +1,243 @@
+"""
+Tests for the database module.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from invoice_processor.core import database
+from invoice_processor.core.database import (initialize_database, save_to_database, save_many_to_database,
+                                             get_all_invoices, count_invoices, query_invoices, get_invoice_by_id)
+
+def make_invoice(invoice_no, vendor="XYZ Traders Inc.", status="Auto-Approved", amount=100.0, confidence=0.9):
+    """
+    Build processed invoice data with the fields the database stores
+    
+    Args:
+        invoice_no (str): Invoice number, used as the invoice ID
+        vendor (str): Vendor name
+        status (str): Validation status
+        amount (float): Total amount
+        confidence (float): Overall confidence
+    
+    Returns:
+        dict: Processed invoice data
+    """
+    return {
+        'metadata': {'invoice_no': invoice_no, 'date': '03/29/2024', 'total_amount': amount},
+        'vendor': {'name': vendor, 'confidence': 1.0},
+        'items': [],
+        'totals': {'total': amount},
+        'validation': {'status': status, 'overall_confidence': confidence, 'warnings': []}
+    }
+
+class TestDatabase(unittest.TestCase):
+    """Test case for the database module"""
+    
+    def setUp(self):
+        """Point the module at a new database in a temporary directory"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.db_path = Path(temp_dir.name) / 'invoices.db'
+        self.csv_path = self.db_path.with_suffix('.csv')
+        
+        for name, value in {'DATABASE_PATH': self.db_path, '_LEGACY_CSV_PATH': self.csv_path,
+                            '_conn': None, '_invoices_cache': None, '_invoice_cache_version': None}.items():
+            patcher = mock.patch.object(database, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        database._load_invoice.cache_clear()
+        self.addCleanup(database._load_invoice.cache_clear)
+        self.addCleanup(self._close_connection)
+    
+    def _close_connection(self):
+        """Close the connection the module opened, if any"""
+        if database._conn is not None:
+            database._conn.close()
+    
+    def _write_externally(self, sql, params=()):
+        """
+        Change the database through a second connection, as another process would
+        
+        Args:
+            sql (str): Statement to execute
+            params (tuple): Statement parameters
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute(sql, params)
+        finally:
+            conn.close()
+    
+    def test_legacy_csv_import(self):
+        """Test records from the old CSV database are imported once"""
+        pd.DataFrame({
+            'invoice_id': ['00123', 'INV2'],
+            'vendor': ['ABC Supplies Ltd.', None],
+            'date': ['01/01/2024', '02/01/2024'],
+            'amount': [10.5, None],
+            'status': ['Auto-Approved', 'Needs Review'],
+            'processed_date': ['2024-01-01 10:00:00', '2024-02-01 10:00:00'],
+            'json_data': ['{}', '{}'],
+            'confidence_score': [0.9, 0.5]
+        }).to_csv(self.csv_path, index=False)
+        
+        self.assertTrue(initialize_database())
+        df = get_all_invoices()
+        
+        # Leading zeros survive, and missing values become NULL
+        self.assertEqual(sorted(df['invoice_id']), ['00123', 'INV2'])
+        self.assertTrue(df.loc[df['invoice_id'] == 'INV2', 'amount'].isna().all())
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['processed_date']))
+        
+        # A table that already has records is left alone
+        self.assertTrue(initialize_database())
+        database._conn.close()
+        database._conn = None
+        self.assertTrue(initialize_database())
+        self.assertEqual(count_invoices(), 2)
+    
+    def test_upsert_replaces_existing_invoice(self):
+        """Test saving an invoice ID again updates its record"""
+        self.assertTrue(save_to_database(make_invoice("INV1", status="Needs Review"), None))
+        self.assertTrue(save_to_database(make_invoice("INV1", status="Auto-Approved", amount=250.0), None))
+        
+        self.assertEqual(count_invoices(), 1)
+        df = get_all_invoices()
+        self.assertEqual(df['status'].tolist(), ["Auto-Approved"])
+        self.assertEqual(df['amount'].tolist(), [250.0])
+    
+    def test_save_many(self):
+        """Test several invoices are saved in one call"""
+        invoices = [make_invoice(f"INV{i}") for i in range(3)] + [make_invoice("INV0", amount=5.0)]
+        self.assertTrue(save_many_to_database(invoices))
+        
+        self.assertEqual(count_invoices(), 3)
+        self.assertEqual(get_invoice_by_id("INV0")['metadata']['total_amount'], 5.0)
+    
+    def test_reads_wait_for_concurrent_save(self):
+        """Test another thread never sees a save that has not committed yet"""
+        conn = database._get_conn()
+        midway = threading.Event()
+        
+        class SlowConnection:
+            """Shared connection whose batch inserts pause halfway through"""
+            def __enter__(self):
+                return conn.__enter__()
+            
+            def __exit__(self, *exc_info):
+                return conn.__exit__(*exc_info)
+            
+            def execute(self, *args):
+                return conn.execute(*args)
+            
+            def executemany(self, sql, rows):
+                def pause_halfway():
+                    for i, row in enumerate(rows):
+                        if i == 2:
+                            midway.set()
+                            time.sleep(0.2)
+                        yield row
+                return conn.executemany(sql, pause_halfway())
+        
+        def save_slowly():
+            with mock.patch.object(database, '_get_conn', SlowConnection):
+                save_many_to_database([make_invoice(f"INV{i}") for i in range(4)])
+        
+        saver = threading.Thread(target=save_slowly)
+        saver.start()
+        midway.wait(5)
+        count = count_invoices()
+        saver.join()
+        self.assertEqual(count, 4)
+    
+    def test_query_filters_and_search(self):
+        """Test status filters and literal, case-insensitive search"""
+        save_many_to_database([
+            make_invoice("INV1", vendor="Zeta 100%_Co", status="Auto-Approved"),
+            make_invoice("INV2", vendor="Zeta 1000 Co", status="Needs Review"),
+            make_invoice("INV3", vendor="acme widgets", status="Manual Processing Required"),
+        ])
+        
+        def ids(**kwargs):
+            return sorted(query_invoices(**kwargs)['invoice_id'])
+        
+        self.assertEqual(ids(statuses=["Needs Review", "Manual Processing Required"]), ["INV2", "INV3"])
+        self.assertEqual(ids(statuses=[]), ["INV1", "INV2", "INV3"])
+        
+        # LIKE wildcards in the search text match literally
+        self.assertEqual(ids(search_text="100%", search_columns=('vendor',)), ["INV1"])
+        self.assertEqual(ids(search_text="_", search_columns=('vendor',)), ["INV1"])
+        self.assertEqual(ids(search_text="ACME", search_columns=('vendor',)), ["INV3"])
+        
+        # Any of the columns may match; unknown columns are ignored
+        self.assertEqual(ids(search_text="inv2", search_columns=('invoice_id', 'vendor')), ["INV2"])
+        self.assertEqual(ids(search_text="inv2", search_columns=('json_data',)), ["INV1", "INV2", "INV3"])
+        
+        # Filters and search combine
+        self.assertEqual(ids(statuses=["Needs Review"], search_text="zeta", search_columns=('vendor',)), ["INV2"])
+    
+    def test_query_sorts_missing_values_last(self):
+        """Test missing values sort last in both directions, with and without NULLS LAST"""
+        save_many_to_database([make_invoice(f"INV{i}", amount=amount) for i, amount in enumerate([30.0, 10.0, 20.0])])
+        self._write_externally("UPDATE invoices SET amount = NULL WHERE invoice_id = 'INV0'")
+        
+        for nulls_last in (True, False):
+            with mock.patch.object(database, '_NULLS_LAST', nulls_last):
+                ascending = query_invoices(sort_column='amount')['invoice_id'].tolist()
+                descending = query_invoices(sort_column='amount', descending=True)['invoice_id'].tolist()
+            self.assertEqual(ascending, ["INV1", "INV2", "INV0"])
+            self.assertEqual(descending, ["INV2", "INV1", "INV0"])
+    
+    def test_listing_cache_invalidation(self):
+        """Test the cached listing is refreshed after saves and external writes"""
+        save_to_database(make_invoice("INV1"), None)
+        self.assertEqual(len(get_all_invoices()), 1)
+        
+        save_to_database(make_invoice("INV2"), None)
+        self.assertEqual(len(get_all_invoices()), 2)
+        
+        self._write_externally("DELETE FROM invoices WHERE invoice_id = 'INV1'")
+        self.assertEqual(get_all_invoices()['invoice_id'].tolist(), ["INV2"])
+        self.assertEqual(get_all_invoices(columns=['invoice_id'])['invoice_id'].tolist(), ["INV2"])
+    
+    def test_listing_cache_concurrent_save(self):
+        """Test a listing read while another thread saves is not cached past the save"""
+        save_to_database(make_invoice("INV1"), None)
+        saver = threading.Thread(target=save_to_database, args=(make_invoice("INV2"), None))
+        read_sql_query = pd.read_sql_query
+        
+        def read_then_save(*args, **kwargs):
+            # Read the old rows, then give the other thread's save a chance to run
+            df = read_sql_query(*args, **kwargs)
+            saver.start()
+            saver.join(0.5)
+            return df
+        
+        with mock.patch.object(database.pd, 'read_sql_query', read_then_save):
+            self.assertEqual(len(get_all_invoices()), 1)
+        saver.join()
+        
+        self.assertEqual(len(get_all_invoices()), 2)
+    
+    def test_invoice_cache_invalidation(self):
+        """Test a cached invoice is refreshed after saves and external writes"""
+        save_to_database(make_invoice("INV1", status="Needs Review"), None)
+        self.assertEqual(get_invoice_by_id("INV1")['validation']['status'], "Needs Review")
+        
+        save_to_database(make_invoice("INV1", status="Auto-Approved"), None)
+        self.assertEqual(get_invoice_by_id("INV1")['validation']['status'], "Auto-Approved")
+        
+        self._write_externally("DELETE FROM invoices WHERE invoice_id = 'INV1'")
+        self.assertIsNone(get_invoice_by_id("INV1"))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file